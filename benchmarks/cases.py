@@ -0,0 +1,119 @@
+import io
+
+import numpy as np
+import plotly.graph_objects as go
+
+from data_loader import (
+    CO2_VALUE_COL, DISASTER_INDICATOR, RENEWABLE_INDICATOR, _indicator_frame, _renewable_frame, merge_co2,
+    merge_impact, normalize_blue_pacific, normalize_co2
+)
+from data_store import Cube, DataStore, Rollup, TableIndex
+from export import available_formats, write_export
+from figures import cumulative_frames, decimate
+from forecast import TrendModel
+from insights import country_summary, regional_summary
+from star import TOTAL_BREAKDOWN
+
+# The data work behind each part of the dashboard, without Streamlit: every
+# case is a function of the prepared context below and does what the app
+# does on a cold cache (loaders) or on a rerun (everything else) for the
+# given dataset. Cases with the same prefix cover the same part of the app.
+
+RENEWABLE_COL = 'Renewable Capacity (W/capita)'
+
+
+def _build_cubes(raw):
+    # Same cubes as data_loader.load_cubes
+    return Rollup(raw, 'Value', TOTAL_BREAKDOWN).totals()
+
+
+def prepare(bp_path, co2_path):
+    # Everything the loaders would have cached, built once per dataset
+    ctx = {'bp_path': bp_path, 'co2_path': co2_path}
+    ctx['raw'] = raw = normalize_blue_pacific(bp_path)
+    ctx['df'] = df = _renewable_frame(raw)
+    ctx['co2_long'] = co2_long = normalize_co2(co2_path)
+    ctx['merged'] = merged = merge_co2(df, co2_long)
+    ctx['impact'] = impact = merge_impact(_indicator_frame(raw, DISASTER_INDICATOR), co2_long)
+    ctx['cubes'] = _build_cubes(raw)
+    ctx['co2_cube'] = Cube(merged, CO2_VALUE_COL)
+    ctx['store'] = DataStore(raw.dropna(subset=['Value']), ['Value'])
+    ctx['merged_store'] = DataStore(merged, [RENEWABLE_COL, CO2_VALUE_COL])
+    ctx['impact_store'] = impact_store = DataStore(impact, ['Value', CO2_VALUE_COL])
+    ctx['table_index'] = TableIndex(df, RENEWABLE_COL)
+    ctx['trends'] = TrendModel(ctx['cubes'][RENEWABLE_INDICATOR])
+    ctx['countries'] = countries = sorted(df['Country'].unique())
+    ctx['three_countries'] = countries[:3]
+    ctx['years'] = (int(df['Year'].min()), int(df['Year'].max()))
+    ctx['impact_countries'] = impact_store.countries(DISASTER_INDICATOR)
+    ctx['grouped'] = ctx['cubes'][RENEWABLE_INDICATOR].to_frame('mean', countries, ctx['years'], RENEWABLE_COL)
+    return ctx
+
+
+def _narrow(years):
+    # The middle half of a year range, like a dragged slider
+    first, last = years
+    quarter = (last - first) // 4
+    return (first + quarter, last - quarter)
+
+
+def _animation(ctx, countries):
+    store = ctx['impact_store']
+    series = []
+    for country in countries:
+        rows = store.slice(DISASTER_INDICATOR, [country])
+        years = rows['Year'].to_numpy()
+        series.append((years, rows['Value'].to_numpy()))
+        series.append((years, rows[CO2_VALUE_COL].to_numpy()))
+    years = np.unique(store.slice(DISASTER_INDICATOR, countries)['Year'].to_numpy())
+    frames = cumulative_frames(series, years)
+    fig = go.Figure([go.Scatter(x=x, y=y) for x, y in series])
+    fig.frames = frames
+    return fig
+
+
+def _export(fmt):
+    def run(ctx):
+        out = io.BytesIO()
+        write_export(ctx['df'], fmt, out)
+        return out.getbuffer().nbytes
+    return run
+
+
+CASES = {
+    # Loaders (cold start, or a source file changed)
+    'load.blue_pacific': lambda ctx: normalize_blue_pacific(ctx['bp_path']),
+    'load.renewable': lambda ctx: _renewable_frame(ctx['raw']),
+    'load.co2_melt': lambda ctx: normalize_co2(ctx['co2_path']),
+    'load.co2_merge': lambda ctx: merge_co2(ctx['df'], ctx['co2_long']),
+    'load.impact_merge': lambda ctx: merge_impact(_indicator_frame(ctx['raw'], DISASTER_INDICATOR), ctx['co2_long']),
+    'load.cubes': lambda ctx: _build_cubes(ctx['raw']),
+    'load.stores': lambda ctx: (
+        DataStore(ctx['raw'].dropna(subset=['Value']), ['Value']),
+        DataStore(ctx['merged'], [RENEWABLE_COL, CO2_VALUE_COL]),
+        DataStore(ctx['impact'], ['Value', CO2_VALUE_COL])
+    ),
+    'load.table_index': lambda ctx: TableIndex(ctx['df'], RENEWABLE_COL),
+    'load.trends': lambda ctx: TrendModel(ctx['cubes'][RENEWABLE_INDICATOR]),
+    # Per-chart filtering/aggregation on a rerun
+    'filter.vis1_all': lambda ctx: ctx['cubes'][RENEWABLE_INDICATOR].to_frame('mean', ctx['countries'], ctx['years'], RENEWABLE_COL),
+    'filter.vis1_three': lambda ctx: ctx['cubes'][RENEWABLE_INDICATOR].to_frame('mean', ctx['three_countries'], _narrow(ctx['years']), RENEWABLE_COL),
+    'filter.vis2_all': lambda ctx: ctx['co2_cube'].to_frame('mean', ctx['countries'], ctx['years']),
+    'filter.vis3_scatter': lambda ctx: ctx['merged_store'].slice(countries=ctx['countries'], year_range=ctx['years']).dropna(subset=[CO2_VALUE_COL]),
+    'filter.table_page': lambda ctx: ctx['table_index'].page(ctx['table_index'].positions('(All)', '(All)'), 1, 25),
+    'filter.table_value': lambda ctx: ctx['table_index'].page(ctx['table_index'].positions('(All)', '(All)', (1.0, 50.0)), 1, 25),
+    'filter.disaster_country': lambda ctx: ctx['store'].slice(DISASTER_INDICATOR, ctx['impact_countries'][:1]),
+    'filter.decimate': lambda ctx: decimate(ctx['grouped'], 'Year', RENEWABLE_COL, 'Country'),
+    # Insight text
+    'insight.country_summary': lambda ctx: country_summary(ctx['cubes'][RENEWABLE_INDICATOR], ctx['countries'], ctx['years']),
+    'insight.regional_summary': lambda ctx: regional_summary(ctx['cubes'][DISASTER_INDICATOR]),
+    'insight.forecast': lambda ctx: ctx['trends'].predict(ctx['countries'], ctx['years'], min_points=3),
+    # Animation frames
+    'animation.two_countries': lambda ctx: _animation(ctx, ctx['impact_countries'][:2]),
+    'animation.twenty_countries': lambda ctx: _animation(ctx, ctx['impact_countries'][:20]),
+    # Download (full renewable table)
+    'export.csv': _export('CSV'),
+    'export.csv_gzip': _export('CSV (gzip)'),
+}
+if 'Parquet' in available_formats():
+    CASES['export.parquet'] = _export('Parquet')
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from benchmarks.run import git_revision  # noqa: E402
+from benchmarks.synthetic import SYNTHETIC_DIR  # noqa: E402
+
+# Rerun latency under concurrent users. Every simulated session is its own
+# AppTest (own session state and widget values) running in this process,
+# so, as on a Streamlit server, the sessions share st.cache_resource and
+# compete for the same interpreter. Each session loads the page, then
+# repeatedly changes one of the scripted widgets and times the rerun.
+#   python -m benchmarks.loadtest                         # 8 sessions x 20 interactions
+#   python -m benchmarks.loadtest --sessions 32 --interactions 50 --think-time 0.5
+#   python -m benchmarks.loadtest --widgets v1-year table-value
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app_gabungan.py')
+
+
+def _year_range(rng, low, high):
+    first = rng.randint(low, high)
+    return (first, rng.randint(first, high))
+
+
+def drag_v1_year(at, rng):
+    slider = at.slider(key='v1-year')
+    slider.set_value(_year_range(rng, int(slider.min), int(slider.max)))
+
+
+def pick_v2_countries(at, rng):
+    multiselect = at.multiselect(key='v2-country')
+    multiselect.set_value(rng.sample(list(multiselect.options), rng.randint(1, len(multiselect.options))))
+
+
+def drag_table_value(at, rng):
+    slider = at.slider(key='table-value')
+    low, high = float(slider.min), float(slider.max)
+    first = rng.uniform(low, high)
+    slider.set_value((first, rng.uniform(first, high)))
+
+
+def pick_animation_countries(at, rng):
+    multiselect = at.multiselect(key='animasi-impact-country')
+    multiselect.set_value(rng.sample(list(multiselect.options), rng.randint(1, min(4, len(multiselect.options)))))
+
+
+# Widget key -> interaction that gives it a new random value
+WIDGETS = {
+    'v1-year': drag_v1_year,
+    'v2-country': pick_v2_countries,
+    'table-value': drag_table_value,
+    'animasi-impact-country': pick_animation_countries,
+}
+
+
+def session(app, widgets, interactions, think_time, timeout, seed, record):
+    # One simulated user: page load, then `interactions` widget changes
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    at = AppTest.from_file(app, default_timeout=timeout).run()
+    record('initial', time.perf_counter() - t0, len(at.exception))
+    for _ in range(interactions):
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+        widget = rng.choice(widgets)
+        try:
+            WIDGETS[widget](at, rng)
+        except KeyError:
+            # Section not shown (e.g. no CO2 file)
+            record(widget, None, 1)
+            continue
+        t0 = time.perf_counter()
+        at.run()
+        record(widget, time.perf_counter() - t0, len(at.exception))
+
+
+def summarize(samples, wall):
+    # Latency percentiles and throughput (reruns per second of test time)
+    summary = {}
+    for widget, entries in samples.items():
+        latencies = np.array([latency for latency, _ in entries if latency is not None])
+        summary[widget] = {
+            'reruns': len(latencies),
+            'errors': sum(1 for _, errors in entries if errors),
+            'throughput_per_s': len(latencies) / wall,
+        }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            summary[widget].update(p50_s=p50, p95_s=p95, p99_s=p99, max_s=latencies.max())
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent AppTest load test of the dashboard.')
+    parser.add_argument('--app', default=APP)
+    parser.add_argument('--sessions', type=int, default=8, help='concurrent simulated users')
+    parser.add_argument('--interactions', type=int, default=20, help='widget changes per session')
+    parser.add_argument('--widgets', nargs='+', choices=list(WIDGETS), default=list(WIDGETS))
+    parser.add_argument('--think-time', type=float, default=0.0, help='mean pause between interactions, in seconds')
+    parser.add_argument('--timeout', type=float, default=300, help='per-rerun AppTest timeout, in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='results file (default .cache/benchmarks/loadtest-<git rev>.json)')
+    args = parser.parse_args()
+
+    samples = defaultdict(list)
+    lock = threading.Lock()
+
+    def record(widget, latency, errors):
+        with lock:
+            samples[widget].append((latency, errors))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [
+            pool.submit(session, args.app, args.widgets, args.interactions, args.think_time, args.timeout, args.seed + k, record)
+            for k in range(args.sessions)
+        ]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+
+    summary = summarize(samples, wall)
+    print(f'{args.sessions} sessions x {args.interactions} interactions in {wall:.1f} s')
+    print(f"  {'widget':24s} {'reruns':>7s} {'errors':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'rerun/s':>8s}")
+    for widget, stats in summary.items():
+        if stats['reruns']:
+            print(f"  {widget:24s} {stats['reruns']:7d} {stats['errors']:7d} {stats['p50_s'] * 1e3:9.1f} {stats['p95_s'] * 1e3:9.1f} {stats['p99_s'] * 1e3:9.1f} {stats['throughput_per_s']:8.2f}")
+        else:
+            print(f"  {widget:24s} {0:7d} {stats['errors']:7d}")
+    revision = git_revision()
+    path = args.json or os.path.join(SYNTHETIC_DIR, f'loadtest-{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'app': os.path.relpath(args.app),
+            'sessions': args.sessions,
+            'interactions': args.interactions,
+            'think_time_s': args.think_time,
+            'wall_s': wall,
+            'widgets': summary
+        }, f, indent=2)
+    print(f'\nWrote {path}')
+
+
+if __name__ == '__main__':
+    main()
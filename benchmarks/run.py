@@ -0,0 +1,125 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.cases import CASES, prepare  # noqa: E402
+from benchmarks.synthetic import SYNTHETIC_DIR, synthetic_dataset  # noqa: E402
+
+# Timings and peak memory of the dashboard data paths, on the bundled data
+# (scale 1) and on synthetic copies scaled up to 1000x. Runs offline; the
+# synthetic CSVs are generated once into .cache/benchmarks.
+#   python -m benchmarks.run                              # all cases, scales 1 10 100
+#   python -m benchmarks.run --scales 1 1000 --cases 'filter.*'
+#   python -m benchmarks.run --compare .cache/benchmarks/results-abc1234.json
+# Peak memory is what tracemalloc sees, i.e. Python, NumPy and pandas
+# allocations; pyarrow's own buffers (CSV parsing) are not included.
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{rev}-dirty' if dirty else rev
+
+
+def measure(case, ctx, repeat, min_time):
+    # Wall times of `repeat` runs (more for fast cases, until min_time has
+    # passed), then one run under tracemalloc for the peak allocation
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat or (time.perf_counter() - started < min_time and len(times) < 100 * repeat):
+        t0 = time.perf_counter()
+        case(ctx)
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        case(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'runs': len(times),
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+        'peak_bytes': peak
+    }
+
+
+def run(scales, patterns, repeat, min_time):
+    names = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+    results = []
+    for scale in scales:
+        bp_path, co2_path = synthetic_dataset(scale)
+        t0 = time.perf_counter()
+        ctx = prepare(bp_path, co2_path)
+        print(f"scale {scale}: {len(ctx['raw']):,} rows, {len(ctx['countries'])} countries, prepared in {time.perf_counter() - t0:.1f} s")
+        for name in names:
+            result = measure(CASES[name], ctx, repeat, min_time)
+            results.append(dict(result, case=name, scale=scale, rows=len(ctx['raw'])))
+            print(f"  {name:28s} {result['median_s'] * 1e3:10.2f} ms  {result['peak_bytes'] / 2**20:9.2f} MiB peak")
+    return results
+
+
+def compare(results, baseline):
+    # Median time ratio against an earlier results file, per (case, scale)
+    before = {(r['case'], r['scale']): r for r in baseline['results']}
+    print(f"\nCompared with {baseline['revision']} (ratio > 1 is slower now):")
+    for result in results:
+        old = before.get((result['case'], result['scale']))
+        if old:
+            print(f"  {result['case']:28s} x{result['scale']:<5} time {result['median_s'] / old['median_s']:6.2f}  peak {result['peak_bytes'] / max(old['peak_bytes'], 1):6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard data paths.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help='dataset sizes relative to the bundled data (e.g. 1 10 100 1000)')
+    parser.add_argument('--cases', nargs='+', default=['*'], metavar='PATTERN', help="case names or globs, e.g. 'load.*'")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='keep repeating fast cases for this many seconds')
+    parser.add_argument('--json', metavar='PATH', help='results file (default .cache/benchmarks/results-<git rev>.json)')
+    parser.add_argument('--compare', metavar='PATH', help='earlier results file to compare with')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args()
+    if args.list:
+        print('\n'.join(CASES))
+        return
+
+    revision = git_revision()
+    results = run(args.scales, args.cases, args.repeat, args.min_time)
+    report = {
+        'revision': revision,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results
+    }
+    path = args.json or os.path.join(SYNTHETIC_DIR, f'results-{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nWrote {path}')
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import BLUE_PACIFIC_FILE, CACHE_DIR, CACHE_VERSION, find_co2_file, normalize_star
+from star import DIMENSIONS
+
+# Scaled copies of the bundled CSVs, in the same file formats, so every
+# benchmark goes through the real parsing code. A scale is spread over more
+# countries, more years and more indicators: every replica of the data
+# renames the countries ('Fiji (3)'), shifts the years by whole spans of the
+# original range, renames the indicators, or a mix of the three. The first
+# replica keeps the original names and codes, so the disaster indicator
+# and the CO2 join still match (renamed countries match on their names).
+# The SDMX breakdown code columns are kept as they are. Values get a little
+# deterministic noise so replicas do not collapse into duplicates.
+
+SYNTHETIC_DIR = os.path.join(CACHE_DIR, 'benchmarks')
+
+
+def split_scale(scale):
+    # (countries, years, indicators) multipliers whose product is `scale`:
+    # prime factors, largest first, handed out round-robin
+    factors, n, p = [], scale, 2
+    while n > 1:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 1
+    multipliers = [1, 1, 1]
+    for k, factor in enumerate(sorted(factors, reverse=True)):
+        multipliers[k % 3] *= factor
+    return tuple(multipliers)
+
+
+def _suffix(name, k):
+    return name if k == 0 else f'{name} ({k})'
+
+
+def _source_frame():
+    # Normalized Blue Pacific rows next to their breakdown code columns
+    star = normalize_star(BLUE_PACIFIC_FILE)
+    breakdown = star.dimensions['breakdown']
+    codes = [code for code, _ in DIMENSIONS['breakdown'] if code in breakdown.columns]
+    return pd.concat([star.to_frame(), breakdown[codes].iloc[star.facts['breakdown_id']].reset_index(drop=True)], axis=1)
+
+
+def scale_blue_pacific(df, scale, seed=0):
+    # Rows of _source_frame() repeated `scale` times as described above
+    n_countries, n_years, n_indicators = split_scale(scale)
+    breakdown = {code: df[code].to_numpy() for code, _ in DIMENSIONS['breakdown'] if code in df.columns}
+    span = int(df['Year'].max()) - int(df['Year'].min()) + 1
+    rng = np.random.default_rng(seed)
+    countries = df['Country'].astype(str).to_numpy()
+    codes = df['Country Code'].astype(str).to_numpy()
+    indicators = df['Indicator'].astype(str).to_numpy()
+    years = df['Year'].to_numpy(dtype=np.int64)
+    values = df['Value'].to_numpy()
+    pieces = []
+    for i in range(n_indicators):
+        for y in range(n_years):
+            for c in range(n_countries):
+                noise = 1 if i == y == c == 0 else rng.uniform(0.9, 1.1, len(values))
+                pieces.append(pd.DataFrame({
+                    'Indicator': [_suffix(name, i) for name in indicators],
+                    **breakdown,
+                    'GEO_PICT': [code if c == 0 else f'{code}{c}' for code in codes],
+                    'Pacific Island Countries and territories': [_suffix(name, c) for name in countries],
+                    'TIME_PERIOD': years + y * span,
+                    'OBS_VALUE': values * noise
+                }))
+    return pd.concat(pieces, ignore_index=True), (n_countries, n_years, span)
+
+
+def scale_co2(co2_path, n_countries, n_years, span, first_year):
+    # World Bank CO2 table with the same renamed countries and shifted years
+    df = pd.read_csv(co2_path, skiprows=4)
+    df = df.loc[:, ~df.columns.str.startswith('Unnamed')]
+    base_years = [str(year) for year in range(first_year, first_year + span) if str(year) in df.columns]
+    shifted = {str(int(year) + y * span): df[year] for y in range(1, n_years) for year in base_years}
+    df = pd.concat([df, pd.DataFrame(shifted)], axis=1)
+    pieces = []
+    for c in range(n_countries):
+        piece = df.copy()
+        piece['Country Name'] = [_suffix(name, c) for name in df['Country Name']]
+        piece['Country Code'] = [code if c == 0 else f'{code}{c}' for code in df['Country Code']]
+        pieces.append(piece)
+    return pd.concat(pieces, ignore_index=True)
+
+
+def synthetic_dataset(scale):
+    # (blue pacific CSV, CO2 CSV) paths for `scale`; the bundled files for
+    # scale 1, otherwise generated once into .cache/benchmarks/scale-N-vC
+    # (C = data_loader.CACHE_VERSION)
+    if scale == 1:
+        return BLUE_PACIFIC_FILE, find_co2_file()
+    out_dir = os.path.join(SYNTHETIC_DIR, f'scale-{scale}-v{CACHE_VERSION}')
+    bp_path = os.path.join(out_dir, 'blue_pacific.csv')
+    co2_path = os.path.join(out_dir, 'API_co2.csv')
+    if os.path.exists(bp_path) and os.path.exists(co2_path):
+        return bp_path, co2_path
+    os.makedirs(out_dir, exist_ok=True)
+    df = _source_frame()
+    df_scaled, (n_countries, n_years, span) = scale_blue_pacific(df, scale)
+    df_scaled.to_csv(f'{bp_path}.tmp', index=False)
+    df_co2 = scale_co2(find_co2_file(), n_countries, n_years, span, int(df['Year'].min()))
+    with open(f'{co2_path}.tmp', 'w', newline='', encoding='utf-8') as f:
+        # Same four preamble lines as the World Bank download
+        f.write('"Data Source","World Development Indicators",\n\n"Last Updated Date","synthetic",\n\n')
+        df_co2.to_csv(f, index=False, quoting=csv.QUOTE_ALL)
+    os.replace(f'{bp_path}.tmp', bp_path)
+    os.replace(f'{co2_path}.tmp', co2_path)
+    return bp_path, co2_path
@@ -0,0 +1,219 @@
+import glob
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+import streamlit as st
+
+from data_loader import (
+    BASE_DIR, CACHE_DIR, _load_cached, _load_cached_star, file_fingerprint, normalize_star, normalize_worldbank,
+    read_csv_columns
+)
+from memo import LRUCache
+from registry import dataset_registry, nbytes, view
+from star import StarSchema
+
+# Local catalog of the dataflows one deployment serves: every SPC .Stat
+# SDMX CSV (the Blue Pacific 2050 thematic areas, ...) and World Bank API_*
+# CSV found in DATA_DIRS. The manifest (dataflow id -> file, schema, name,
+# indicators) is kept in .cache/catalog.json and a file is only read again
+# when its fingerprint changes, so listing the catalog reads no data. A
+# dataflow's data is loaded the first time something asks for it and kept
+# in a byte-bounded LRU cache, so startup time and memory do not grow with
+# the number of files.
+#
+# DASHBOARD_DATA_DIRS=dir1:dir2    more directories to scan (os.pathsep separated)
+# DASHBOARD_DATAFLOW_CACHE_MB=256  memory budget of the loaded dataflows
+
+DATA_DIRS = [BASE_DIR] + [path for path in os.environ.get('DASHBOARD_DATA_DIRS', '').split(os.pathsep) if path]
+MANIFEST_FILE = os.path.join(CACHE_DIR, 'catalog.json')
+DATAFLOW_CACHE_BYTES = int(float(os.environ.get('DASHBOARD_DATAFLOW_CACHE_MB', 256)) * 2 ** 20)
+
+
+def discover(data_dirs=DATA_DIRS):
+    # (path, fingerprint) of every CSV in the data directories and their
+    # direct subdirectories (a World Bank zip extracts into its own folder)
+    paths = set()
+    for data_dir in data_dirs:
+        for pattern in ('*.csv', os.path.join('*', '*.csv')):
+            paths.update(os.path.abspath(path) for path in glob.glob(os.path.join(data_dir, pattern)))
+    return tuple((path, file_fingerprint(path)) for path in sorted(paths))
+
+
+def _schema(path):
+    with open(path, encoding='utf-8-sig', errors='replace') as f:
+        first_line = f.readline()
+    if 'STRUCTURE_ID' in first_line and 'OBS_VALUE' in first_line:
+        return 'sdmx'
+    if first_line.startswith('"Data Source"') and os.path.basename(path).startswith('API_'):
+        return 'worldbank'
+    return None
+
+
+def _dataflow_id(structure_id):
+    # 'SPC:DF_BP50_5(1.0)' -> 'DF_BP50_5'
+    match = re.fullmatch(r'(?:[^:]*:)?([^(]+)(?:\(.*\))?', structure_id.strip())
+    return match.group(1) if match else structure_id
+
+
+def describe(path):
+    # Manifest entry of one file, None if it is not a dataflow
+    schema = _schema(path)
+    if schema == 'sdmx':
+        df = read_csv_columns(path, {'STRUCTURE_ID': 'category', 'STRUCTURE_NAME': 'category', 'Indicator': 'category'})
+        if df.empty:
+            return None
+        dataflow_id, name = _dataflow_id(str(df['STRUCTURE_ID'].iloc[0])), str(df['STRUCTURE_NAME'].iloc[0])
+        indicators = sorted({' '.join(str(label).split()) for label in df['Indicator'].cat.categories})
+    elif schema == 'worldbank':
+        df = read_csv_columns(path, {'Indicator Name': 'category', 'Indicator Code': 'category'}, skiprows=4)
+        if df.empty:
+            return None
+        dataflow_id, name = str(df['Indicator Code'].iloc[0]), str(df['Indicator Name'].iloc[0])
+        indicators = [name]
+    else:
+        return None
+    return {
+        'id': dataflow_id,
+        'schema': schema,
+        'name': name,
+        'indicators': indicators,
+        'path': path,
+        'fingerprint': list(file_fingerprint(path))
+    }
+
+
+def build_manifest(listing, previous=()):
+    # Entries of the dataflow files in listing; entries of unchanged files
+    # are taken from `previous` instead of reading the file again
+    known = {(entry['path'], tuple(entry['fingerprint'])): entry for entry in previous}
+    entries = []
+    for path, fingerprint in listing:
+        entry = known.get((path, tuple(fingerprint)))
+        if entry is None:
+            try:
+                entry = describe(path)
+            except Exception:
+                # Unreadable or not the format its first line suggested
+                entry = None
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def _read_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)['dataflows']
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def _write_manifest(entries, path=MANIFEST_FILE):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'dataflows': entries}, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only checkout describes the files again on every start
+        pass
+
+
+class Catalog:
+    # Manifest entries by dataflow id; when two files have the same id, the
+    # first in path order wins
+
+    def __init__(self, entries):
+        self.entries = {}
+        for entry in entries:
+            self.entries.setdefault(entry['id'], entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def ids(self, schema=None):
+        return [dataflow_id for dataflow_id, entry in self.entries.items() if schema is None or entry['schema'] == schema]
+
+    def find(self, indicator):
+        # Id of the first dataflow publishing an indicator, None if none does
+        indicator = ' '.join(indicator.split())
+        return next((dataflow_id for dataflow_id, entry in self.entries.items() if indicator in entry['indicators']), None)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'Dataflow': list(self.entries),
+            'Schema': [entry['schema'] for entry in self.entries.values()],
+            'Name': [entry['name'] for entry in self.entries.values()],
+            'Indicators': [len(entry['indicators']) for entry in self.entries.values()],
+            'File': [os.path.relpath(entry['path'], BASE_DIR) for entry in self.entries.values()]
+        })
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_catalog(listing):
+    entries = build_manifest(listing, _read_manifest())
+    _write_manifest(entries)
+    return Catalog(entries)
+
+
+def load_catalog(data_dirs=DATA_DIRS):
+    # Rebuilt (from the manifest) only when a file is added, removed or changed
+    return _load_catalog(discover(data_dirs))
+
+
+# --- LAZY DATAFLOW LOADING ---
+def _registered(data):
+    # The table of a loaded dataflow that goes into the dataset registry
+    return data.facts if isinstance(data, StarSchema) else data
+
+
+def _sizeof(data):
+    return nbytes(data.tables() if isinstance(data, StarSchema) else data)
+
+
+def _unregister(key, data):
+    # Evicted: the registry must not keep the buffers alive either
+    dataset_registry().remove(f'dataflow:{key[0]}', _registered(data))
+
+
+@st.cache_resource(show_spinner=False)
+def dataflow_cache():
+    # Loaded dataflows of the process, least recently used evicted first
+    return LRUCache(max_entries=64, max_bytes=DATAFLOW_CACHE_BYTES, sizeof=_sizeof, on_evict=_unregister)
+
+
+def _read_dataflow(entry):
+    # From the columnar cache when it is newer than the file
+    cache_name = f"dataflow.{entry['id']}"
+    if entry['schema'] == 'sdmx':
+        return _load_cached_star(cache_name, [entry['path']], lambda: normalize_star(entry['path']))
+    return _load_cached(cache_name, [entry['path']], lambda: normalize_worldbank(entry['path']))
+
+
+def load_dataflow(dataflow_id, catalog=None):
+    # A StarSchema (sdmx) or a view of the Country/Country Code/Year/Value
+    # rows (worldbank) of one catalog dataflow, loaded on first use
+    entry = (catalog or load_catalog()).entries[dataflow_id]
+
+    def load():
+        data = _read_dataflow(entry)
+        dataset_registry().add(f'dataflow:{dataflow_id}', _registered(data))
+        return data
+    data = dataflow_cache().get_or_compute((dataflow_id, tuple(entry['fingerprint'])), load)
+    return data if isinstance(data, StarSchema) else view(data)
+
+
+def loaded_dataflows():
+    # Ids of the dataflows currently held in memory
+    return [dataflow_id for dataflow_id, _ in dataflow_cache().keys()]
+
+
+if __name__ == '__main__':
+    if sys.argv[1:]:
+        sys.exit('usage: python catalog.py')
+    print(load_catalog().to_frame().to_string(index=False))
+    print(f'\nManifest: {MANIFEST_FILE}')
@@ -0,0 +1,16 @@
+import importlib
+
+from instrument import section
+
+# Page sections, each in its own module exposing render(state). A section's
+# module is imported the first time the section is rendered, so a page only
+# imports the sections it draws.
+# `state` is a plain dict shared by the sections of one script run: the
+# loaded data goes in, and a section can leave values (e.g. its current
+# selection) for the sections after it. Each section is timed under its
+# module name (see instrument.py).
+
+
+def render(name, state):
+    with section(name):
+        return importlib.import_module(f'{__name__}.{name}').render(state)
@@ -0,0 +1,54 @@
+import plotly.express as px
+import streamlit as st
+
+from figures import cached_plotly_chart, decimate, render_mode
+from insights import country_summary
+from instrument import note
+from memo import memoize_filter, selection_key
+
+
+def render(state):
+    df, countries, co2_cube, data_version = state['df'], state['countries'], state['co2_cube'], state['data_version']
+    if co2_cube is not None:
+        st.header("CO₂ Emissions Trend per Country")
+        st.markdown("This trend shows the change in CO₂ emissions over time. A decrease in emissions can indicate a successful renewable energy transition.")
+        vis2_countries = st.multiselect('Select countries (visualization 2)', countries, default=countries, key='v2-country')
+        vis2_year_min, vis2_year_max = int(df['Year'].min()), int(df['Year'].max())
+        vis2_years = st.slider('Select year range (visualization 2)', vis2_year_min, vis2_year_max, (vis2_year_min, vis2_year_max), key='v2-year')
+        grouped2 = memoize_filter('v2', data_version, vis2_countries, vis2_years, lambda: co2_cube.to_frame('mean', vis2_countries, vis2_years))
+        note(rows=len(grouped2))
+
+        def build():
+            # Thinned to what the chart can show; the exact rows stay in grouped2
+            plot2 = decimate(grouped2, 'Year', 'CO2 Emissions (Mt CO2e)', 'Country')
+            fig2 = px.line(
+                plot2,
+                x='Year',
+                y='CO2 Emissions (Mt CO2e)',
+                color='Country',
+                markers=True,
+                render_mode=render_mode(plot2),
+                labels={'CO2 Emissions (Mt CO2e)': 'CO₂ Emissions (Mt)', 'Year': 'Year'},
+                title='CO₂ Emissions Trend per Country'
+            )
+            fig2.update_layout(legend_title_text='Country', hovermode='x unified', transition={'duration': 500, 'easing': 'cubic-in-out'})
+            return fig2
+        cached_plotly_chart('co2-trend', (data_version,) + selection_key(vis2_countries, vis2_years), build, use_container_width=True, key="line2-main")
+        # Automatic insight for CO2 emissions trend
+        desc2 = ""
+        if len(vis2_countries) == 1:
+            country = vis2_countries[0]
+            summary = country_summary(co2_cube, vis2_countries, vis2_years)
+            max_val = summary['max'].max()
+            min_val = summary['min'].min()
+            if max_val > min_val:
+                desc2 = f"CO₂ emissions in {country} highest {max_val:.2f} Mt and lowest {min_val:.2f} Mt in the selected period."
+            else:
+                desc2 = f"CO₂ emissions in {country} were relatively stable in the selected period."
+        elif len(vis2_countries) > 1:
+            lowest = country_summary(co2_cube, vis2_countries, vis2_years)['mean'].idxmin()
+            desc2 = f"Country with the lowest average CO₂ emissions in this period: {lowest}."
+        else:
+            desc2 = "Please select a country to see the insight."
+        st.info(f"Insight: {desc2}")
+        state.update(grouped2=grouped2, vis2_countries=vis2_countries, vis2_years=vis2_years)
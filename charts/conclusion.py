@@ -0,0 +1,44 @@
+import streamlit as st
+
+from data_loader import RENEWABLE_INDICATOR
+
+
+def render(state):
+    cubes, co2_cube = state['cubes'], state['co2_cube']
+    st.header('Conclusion & Insights on Disaster and Climate Impact in the Pacific Region')
+
+    # Automated conclusion based on visualization results
+    summary = []
+    if 'grouped' in state and not state['grouped'].empty:
+        highest_country = cubes[RENEWABLE_INDICATOR].by_country('max', state['vis1_countries'], state['vis1_years'], plane='mean').idxmax()
+        summary.append(f"Country with the highest renewable electricity capacity: <b>{highest_country}</b>.")
+    if 'grouped2' in state and not state['grouped2'].empty:
+        lowest_emission_country = co2_cube.by_country('mean', state['vis2_countries'], state['vis2_years'], plane='mean').idxmin()
+        summary.append(f"Country with the lowest average CO₂ emissions: <b>{lowest_emission_country}</b>.")
+    total_per_country = state.get('total_per_country')
+    if total_per_country is not None and not total_per_country.empty:
+        most_affected_country = total_per_country.loc[total_per_country[state['value_col']].idxmax(), 'Country']
+        summary.append(f"Country with the highest number of people affected by disaster: <b>{most_affected_country}</b>.")
+
+    st.markdown(f"""
+<div style='background-color:#e3f2fd; padding:18px; border-radius:8px; margin-bottom:20px;'>
+<b style='color:#1976d2;'>Description & Automated Analysis:</b><br>
+<span style='color:#111; font-size:1.08em; font-weight:500;'>
+{'<br>'.join(summary) if summary else 'Data not available for automated analysis.'}
+</span>
+</div>
+""", unsafe_allow_html=True)
+
+    st.info('''
+Insights:
+- Countries with consistent renewable energy transition tend to experience a decrease in CO₂ emissions, but disaster impacts remain significant.
+- Years with the highest number of people affected by disaster are often not directly related to carbon emissions, indicating other factors such as disaster intensity and social vulnerability.
+- Efforts to mitigate climate change through renewable energy are important, but adaptation and community protection remain crucial to reduce disaster impacts.
+''')
+
+    st.markdown('''
+<div style='background-color:#fffde7; padding:16px; border-radius:8px; margin-bottom:20px;'>
+<b style='color:#f57c00;'>Conclusion:</b><br>
+<span style='color:#222;'><i>The transition to renewable energy in the Pacific region has the potential to reduce carbon emissions, but has not yet fully reduced the number of people affected by disasters. Policy adaptation, community capacity building, and regional collaboration are essential to face the challenges of climate change and disasters in the future.</i></span>
+</div>
+''', unsafe_allow_html=True)
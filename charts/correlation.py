@@ -0,0 +1,37 @@
+import plotly.express as px
+import streamlit as st
+
+from figures import cached_plotly_chart
+from instrument import note
+from memo import selection_key
+
+
+def render(state):
+    df, countries, merged_store, data_version = state['df'], state['countries'], state['merged_store'], state['data_version']
+    if merged_store is not None:
+        st.header("Correlation of Renewable Capacity & CO₂ Emissions")
+        st.markdown("The following scatter plot shows the direct relationship between renewable electricity capacity and CO₂ emissions. Each point represents a country-year.")
+        vis3_countries = st.multiselect('Select countries (visualization 3)', countries, default=countries, key='v3-country')
+        vis3_year_min, vis3_year_max = int(df['Year'].min()), int(df['Year'].max())
+        vis3_years = st.slider('Select year range (visualization 3)', vis3_year_min, vis3_year_max, (vis3_year_min, vis3_year_max), key='v3-year')
+
+        def build():
+            scatter_data = merged_store.slice(countries=vis3_countries, year_range=vis3_years).dropna(subset=['CO2 Emissions (Mt CO2e)'])
+            note(rows=len(scatter_data))
+            fig3_scatter = px.scatter(
+                scatter_data,
+                x='Renewable Capacity (W/capita)',
+                y='CO2 Emissions (Mt CO2e)',
+                color='Country',
+                hover_data=['Year'],
+                title='Renewable Capacity vs CO2 Emissions'
+            )
+            fig3_scatter.update_layout(transition={'duration': 500, 'easing': 'cubic-in-out'})
+            return fig3_scatter
+        # The filtered rows are only needed to build the figure, so the figure cache covers them
+        cached_plotly_chart('correlation-scatter', (data_version,) + selection_key(vis3_countries, vis3_years), build, use_container_width=True, key="scatter_co2-main")
+        st.markdown("""
+If a downward pattern is visible (the higher the renewable capacity, the lower the emissions), it means the clean energy transition is effective in reducing climate change-causing emissions.
+""")
+    else:
+        st.warning("CO₂ emissions data not available. Please ensure the CO₂ file is present in the project folder.")
@@ -0,0 +1,77 @@
+import plotly.express as px
+import streamlit as st
+
+from data_loader import DISASTER_INDICATOR, indicator_view, load_store
+from figures import cached_plotly_chart
+from insights import country_summary, regional_summary
+from instrument import note
+
+
+def render(state):
+    cubes, data_version = state['cubes'], state['data_version']
+    value_col, year_col = 'Value', 'Year'
+    df_disaster = indicator_view(DISASTER_INDICATOR)
+    if df_disaster.empty:
+        st.warning('No data on people affected by disaster in this dataset.')
+    else:
+        st.subheader('Chart of Number of People Affected by Disaster per Country (Total All Years)')
+        disaster_summary = regional_summary(cubes[DISASTER_INDICATOR])
+        total_per_country = disaster_summary['by_country'].rename(value_col).reset_index()
+        note(rows=len(total_per_country))
+
+        def build_total():
+            fig = px.bar(
+                total_per_country,
+                x='Country',
+                y=value_col,
+                color='Country',
+                labels={value_col: 'Total People Affected', 'Country': 'Country'},
+                title='Total People Affected by Disaster per Country (All Years Accumulated)',
+                hover_data={value_col: ':,', 'Country': True}
+            )
+            fig.update_layout(showlegend=False)
+            return fig
+        cached_plotly_chart('disaster-total', (data_version,), build_total, use_container_width=True)
+        max_country = disaster_summary['top_country']
+        max_value = int(disaster_summary['top_value'])
+        min_country = disaster_summary['bottom_country']
+        min_value = int(disaster_summary['bottom_value'])
+        total_affected = int(disaster_summary['total'])
+        mean_affected = int(disaster_summary['mean'])
+        max_year = disaster_summary['worst_year']
+        max_year_value = int(disaster_summary['worst_year_value'])
+        st.info(f"""
+        **Insight:**
+        - Country with the highest number of people affected by disaster: **{max_country}** ({max_value:,} people)
+        - Country with the lowest number affected: **{min_country}** ({min_value:,} people)
+        - Worst year (most affected): **{max_year}** ({max_year_value:,} people across the region)
+        - Total people affected by disaster: **{total_affected:,}**
+        - Average per entry: **{mean_affected:,}**, Median: **{int(disaster_summary['median']):,}**
+        """)
+        st.subheader('Chart of Number of People Affected by Disaster per Country per Year')
+        selected_country = st.selectbox('Select Country', sorted(df_disaster['Country'].unique()))
+
+        def build_country():
+            df_country = load_store().slice(DISASTER_INDICATOR, [selected_country])
+            fig2 = px.line(
+                df_country,
+                x=year_col,
+                y=value_col,
+                markers=True,
+                labels={year_col: 'Year', value_col: 'Number of People Affected'},
+                title=f'Number of People Affected by Disaster in {selected_country} per Year',
+                hover_data={year_col: True, value_col: ':,'}
+            )
+            return fig2
+        cached_plotly_chart('disaster-country', (data_version, selected_country), build_country, use_container_width=True)
+        country_insight = country_summary(cubes[DISASTER_INDICATOR], [selected_country], stat='sum')
+        if not country_insight.empty:
+            max_year_country = country_insight['max_year'].iloc[0]
+            max_val_country = int(country_insight['max'].iloc[0])
+            st.success(f"Worst year for {selected_country}: **{max_year_country}** ({max_val_country:,} people affected)")
+        # Automatic insight for people affected by disaster
+        if not country_insight.empty:
+            total = int(country_insight['total'].iloc[0])
+            worst_year = country_insight['max_year'].iloc[0]
+            st.info(f"Insight: Total people affected in {selected_country} in the selected period: {total:,}. Worst year: {worst_year}.")
+        state.update(total_per_country=total_per_country, value_col=value_col)
@@ -0,0 +1,110 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from data_loader import DISASTER_INDICATOR, load_impact_cubes, load_impact_store
+from figures import cached_plotly_chart, cumulative_frames
+from insights import country_summary
+from instrument import note
+
+
+def render(state):
+    co2_path, merged_store, data_version = state['co2_path'], state['merged_store'], state['data_version']
+    # =====================
+    # COMPARISON OF CARBON EMISSIONS VS PEOPLE AFFECTED BY DISASTER (PER COUNTRY & YEAR) WITH ANIMATION
+    # =====================
+    st.header("Comparison of Carbon Emissions vs Number of People Affected by Disaster")
+
+    if merged_store is not None:
+        animation_store = load_impact_store(co2_path)
+        impact_countries = animation_store.countries(DISASTER_INDICATOR)
+        # Default animation countries: French Polynesia & Marshall Islands
+        default_countries = [n for n in ['French Polynesia', 'Marshall Islands'] if n in impact_countries]
+        animation_countries = st.multiselect('Select Countries for Animation', impact_countries, default=default_countries, key='animasi-impact-country')
+        df_animation = animation_store.slice(DISASTER_INDICATOR, animation_countries)
+        note(rows=len(df_animation))
+
+        def build():
+            fig = go.Figure()
+            # Each country's rows are sliced once (already sorted by year) and
+            # shared by the base traces and every animation frame
+            series = []
+            for country in animation_countries:
+                df_c = animation_store.slice(DISASTER_INDICATOR, [country])
+                years_c = df_c['Year'].to_numpy()
+                series.append((years_c, df_c['Value'].to_numpy()))
+                series.append((years_c, df_c['CO2 Emissions (Mt CO2e)'].to_numpy()))
+                fig.add_trace(go.Scatter(
+                    x=df_c['Year'],
+                    y=df_c['Value'],
+                    mode='lines+markers',
+                    name=f'People Affected - {country}',
+                    yaxis='y1',
+                    line=dict(width=2),
+                    marker=dict(symbol='circle')
+                ))
+                fig.add_trace(go.Scatter(
+                    x=df_c['Year'],
+                    y=df_c['CO2 Emissions (Mt CO2e)'],
+                    mode='lines+markers',
+                    name=f'CO₂ Emissions - {country}',
+                    yaxis='y2',
+                    line=dict(dash='dot', width=2),
+                    marker=dict(symbol='square')
+                ))
+            fig.update_layout(
+                title='Animation: Comparison of CO₂ Emissions vs People Affected by Disaster per Country',
+                xaxis=dict(title='Year'),
+                yaxis=dict(title='People Affected', showgrid=False, color='royalblue'),
+                yaxis2=dict(title='CO₂ Emissions (Mt)', overlaying='y', side='right', color='firebrick'),
+                legend=dict(x=0.01, y=0.99, bgcolor='rgba(255,255,255,0.7)'),
+                hovermode='x unified',
+                margin=dict(l=40, r=40, t=60, b=40),
+                updatemenus=[
+                    dict(
+                        type='buttons',
+                        showactive=False,
+                        y=1.15,
+                        x=1.05,
+                        xanchor='right',
+                        yanchor='top',
+                        buttons=[
+                            dict(label='Play', method='animate', args=[None, {'frame': {'duration': 700, 'redraw': False}, 'fromcurrent': True}]),
+                            dict(label='Pause', method='animate', args=[[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate', 'transition': {'duration': 0}}])
+                        ]
+                    )
+                ]
+            )
+            # Create frame per year: cumulative slices of the series above,
+            # updating the traces in place
+            years = np.unique(df_animation['Year'].to_numpy())
+            fig.frames = cumulative_frames(series, years)
+            return fig
+        # Trace order follows the selection order, so the key keeps it
+        cached_plotly_chart('impact-animation', (data_version, tuple(animation_countries)), build, use_container_width=True)
+        st.markdown("""
+Use the Play/Pause button at the top right of the chart to see the animation of changes in CO₂ emissions and people affected by disaster year by year.
+""")
+        # Automatic explanation from animation chart result
+        if not df_animation.empty:
+            # One row per country-year here, so the last cell of any plane is the last observation
+            impact_cubes = load_impact_cubes(co2_path)
+            people = country_summary(impact_cubes['Value'], animation_countries, stat='sum')['last']
+            emissions = country_summary(impact_cubes['CO2 Emissions (Mt CO2e)'], animation_countries, stat='sum')['last']
+            insight_countries = []
+            for country in animation_countries:
+                if country in people.index:
+                    people_last = int(people[country])
+                    emissions_last = float(emissions[country])
+                    insight_countries.append(f"<b>{country}</b>: People affected {people_last:,}, CO₂ Emissions {emissions_last:.2f} Mt in the last year.")
+            st.markdown(f"""
+<div style='background-color:#e3f2fd; padding:12px; border-radius:8px; margin-bottom:16px;'>
+<b style='color:#222;'>Chart Explanation:</b><br>
+<span style='color:#222;'>
+{'<br>'.join(insight_countries)}<br>
+This animation chart shows that the trend of people affected by disaster does not always align with the country's carbon emissions. Pacific countries can experience major disasters even with very low emissions, highlighting the issue of global climate injustice.
+</span>
+</div>
+""", unsafe_allow_html=True)
+    else:
+        st.info('CO₂ emissions data not available or failed to process.')
@@ -0,0 +1,87 @@
+import plotly.express as px
+import streamlit as st
+
+from data_loader import RENEWABLE_INDICATOR, load_trends
+from figures import cached_plotly_chart, decimate, render_mode
+from insights import country_summary
+from instrument import note
+from memo import memoize_filter, selection_key
+
+
+def render(state):
+    df, countries, cubes, data_version = state['df'], state['countries'], state['cubes'], state['data_version']
+    trends = load_trends()
+    st.header("Renewable Electricity Capacity Trend per Country")
+    st.markdown("This trend shows the clean energy transition efforts in Pacific countries.")
+    vis1_countries = st.multiselect('Select countries (visualization 1)', countries, default=countries, key='v1-country')
+    vis1_year_min, vis1_year_max = int(df['Year'].min()), int(df['Year'].max())
+    vis1_years = st.slider('Select year range (visualization 1)', vis1_year_min, vis1_year_max, (vis1_year_min, vis1_year_max), key='v1-year')
+    # Reused across reruns and sessions until this chart's own filters change
+    grouped = memoize_filter('v1', data_version, vis1_countries, vis1_years, lambda: cubes[RENEWABLE_INDICATOR].to_frame('mean', vis1_countries, vis1_years, 'Renewable Capacity (W/capita)'))
+    note(rows=len(grouped))
+    # Simple prediction (linear trend, fitted for every country at load time)
+    forecast = None
+    if len(vis1_countries) == 1 and len(grouped) > 2:
+        country = vis1_countries[0]
+        forecast = trends[RENEWABLE_INDICATOR].predict(vis1_countries, vis1_years, min_points=3)
+        if not forecast.empty:
+            year_pred = forecast['Year'].to_numpy()
+            pred = forecast['Prediction'].to_numpy()
+            st.info(f"{country} capacity prediction for {int(year_pred[0])}-{int(year_pred[-1])}: {pred[0]:.2f} - {pred[-1]:.2f} W/capita")
+    elif len(vis1_countries) > 1 and st.checkbox('Show 3-year trend prediction for each selected country', key='v1-forecast'):
+        forecast = trends[RENEWABLE_INDICATOR].predict(vis1_countries, vis1_years, min_points=3)
+
+    def build():
+        # Thinned to what the chart can show; the exact rows stay in grouped
+        plot1 = decimate(grouped, 'Year', 'Renewable Capacity (W/capita)', 'Country')
+        # More informative tooltip
+        fig1 = px.line(
+            plot1,
+            x='Year',
+            y='Renewable Capacity (W/capita)',
+            color='Country',
+            markers=True,
+            render_mode=render_mode(plot1),
+            labels={'Renewable Capacity (W/capita)': 'Watt per capita', 'Year': 'Year'},
+            title='Renewable Capacity Trend per Country',
+            hover_data={'Country': True, 'Year': True, 'Renewable Capacity (W/capita)': ':.2f'}
+        )
+        fig1.update_layout(legend_title_text='Country', hovermode='x unified', transition={'duration': 500, 'easing': 'cubic-in-out'})
+        if forecast is None or forecast.empty:
+            return fig1
+        if len(vis1_countries) == 1:
+            pred = forecast['Prediction'].to_numpy()
+            fig1.add_scatter(
+                x=forecast['Year'].to_numpy(), y=pred, mode='lines+markers', name='Prediction', line=dict(dash='dash', color='orange'),
+                error_y=dict(type='data', symmetric=False, array=forecast['Upper'] - pred, arrayminus=pred - forecast['Lower'], thickness=1)
+            )
+        else:
+            for country, rows in forecast.groupby('Country', sort=False):
+                fig1.add_scatter(x=rows['Year'], y=rows['Prediction'], mode='lines', name=f'{country} (prediction)', line=dict(dash='dash'), legendgroup=country)
+        return fig1
+    figure_key = (data_version,) + selection_key(vis1_countries, vis1_years) + (forecast is not None,)
+    cached_plotly_chart('renewable-trend', figure_key, build, use_container_width=True, key="line1-main")
+    # Highlight automatic insight
+    if len(vis1_countries) > 1:
+        delta = country_summary(cubes[RENEWABLE_INDICATOR], vis1_countries, vis1_years)['delta']
+        top_country = delta.idxmax()
+        st.success(f"Country with the largest increase in renewable capacity: {top_country} (+{delta.max():.2f} W/capita)")
+
+    # Automatic insight for renewable capacity trend
+    desc = ""
+    if len(vis1_countries) == 1:
+        country = vis1_countries[0]
+        summary = country_summary(cubes[RENEWABLE_INDICATOR], vis1_countries, vis1_years)
+        max_val = summary['max'].max()
+        min_val = summary['min'].min()
+        if max_val > min_val:
+            desc = f"Renewable electricity capacity in {country} increased from {min_val:.2f} to {max_val:.2f} W/capita in the selected period."
+        else:
+            desc = f"Renewable electricity capacity in {country} was relatively stable in the selected period."
+    elif len(vis1_countries) > 1:
+        highest = country_summary(cubes[RENEWABLE_INDICATOR], vis1_countries, vis1_years)['max'].idxmax()
+        desc = f"Country with the highest renewable capacity in this period: {highest}."
+    else:
+        desc = "Please select a country to see the insight."
+    st.info(f"Insight: {desc}")
+    state.update(grouped=grouped, vis1_countries=vis1_countries, vis1_years=vis1_years)
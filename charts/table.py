@@ -0,0 +1,68 @@
+import streamlit as st
+
+from data_loader import load_table_index
+from export import EXPORT_FORMATS, available_formats, export_bytes
+from instrument import note
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+def _filter_rows(df, country_sel, year_sel, value_range):
+    rows = df
+    if country_sel != '(All)':
+        rows = rows[rows['Country'] == country_sel]
+    if year_sel != '(All)':
+        rows = rows[rows['Year'] == year_sel]
+    if value_range is not None:
+        rows = rows[(rows['Renewable Capacity (W/capita)'] >= value_range[0]) & (rows['Renewable Capacity (W/capita)'] <= value_range[1])]
+    return rows
+
+
+def render(state):
+    df, data_version = state['df'], state['data_version']
+    # Options, bounds and row sets of every filter combination are prebuilt,
+    # so a rerun only slices out the visible page
+    index = load_table_index()
+    st.header("Data Table: Renewable Capacity per Country & Year")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        country_sel = st.selectbox('Filter Country', index.countries, key='table-country')
+    with col2:
+        year_sel = st.selectbox('Filter Year', index.years(country_sel), key='table-year')
+    with col3:
+        min_val, max_val = index.bounds(country_sel, year_sel)
+        if min_val < max_val:
+            value_range = st.slider('Filter Renewable Capacity (W/capita)', min_val, max_val, (min_val, max_val), key='table-value')
+        else:
+            # A single value (one country in one year) leaves nothing to filter
+            value_range = (min_val, max_val)
+    # Only one row for each unique Renewable Capacity (W/capita), but keep country and year columns
+    positions = index.positions(country_sel, year_sel, value_range)
+    note(rows=len(positions))
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox('Rows per page', PAGE_SIZES, key='table-page-size')
+    pages = max(1, -(-len(positions) // page_size))
+    with col2:
+        page = min(st.number_input('Page', min_value=1, value=1, step=1, key='table-page'), pages)
+    st.dataframe(index.page(positions, page, page_size))
+    first_row = (page - 1) * page_size
+    st.caption(f"Rows {min(first_row + 1, len(positions))}-{min(first_row + page_size, len(positions))} of {len(positions)} (page {page} of {pages})")
+
+    # 7. Download Data
+    st.subheader("Download Data")
+    col1, col2 = st.columns(2)
+    with col1:
+        export_rows = st.radio('Rows', ['Current table filters', 'Full dataset'], horizontal=True, key='export-rows')
+    with col2:
+        export_format = st.radio('Format', available_formats(), horizontal=True, key='export-format')
+    # The filtered rows (all of them, not only the de-duplicated table view)
+    # are exported; nothing is built until the button is clicked
+    selection = (country_sel, year_sel, tuple(value_range)) if export_rows == 'Current table filters' else None
+    extension, mime = EXPORT_FORMATS[export_format]
+    st.download_button(
+        label=f"Download {export_format}",
+        data=lambda: export_bytes(export_format, ('table', data_version, selection), lambda: df if selection is None else _filter_rows(df, *selection)),
+        file_name=f'blue_pacific_2050_data{extension}',
+        mime=mime,
+    )
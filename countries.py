@@ -0,0 +1,137 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Country dimension shared by every source. SPC data identifies countries
+# by GEO_PICT (ISO 3166 alpha-2) codes and the World Bank by ISO3 codes,
+# and their display names differ ('Micronesia (Federated States of)' vs
+# 'Micronesia, Fed. Sts.'). Every code and known alias resolves to one
+# dense integer id, so cross-source joins align integer arrays on
+# (country_id, year) instead of hash-joining free-text names.
+
+# (GEO_PICT, ISO3, SPC name, other names) of the Pacific Island Countries
+# and Territories
+PACIFIC_COUNTRIES = [
+    ('AS', 'ASM', 'American Samoa', []),
+    ('CK', 'COK', 'Cook Islands', []),
+    ('FJ', 'FJI', 'Fiji', []),
+    ('FM', 'FSM', 'Micronesia (Federated States of)', ['Micronesia, Fed. Sts.', 'Federated States of Micronesia', 'Micronesia']),
+    ('GU', 'GUM', 'Guam', []),
+    ('KI', 'KIR', 'Kiribati', []),
+    ('MH', 'MHL', 'Marshall Islands', []),
+    ('MP', 'MNP', 'Northern Mariana Islands', []),
+    ('NC', 'NCL', 'New Caledonia', []),
+    ('NR', 'NRU', 'Nauru', []),
+    ('NU', 'NIU', 'Niue', []),
+    ('PF', 'PYF', 'French Polynesia', []),
+    ('PG', 'PNG', 'Papua New Guinea', []),
+    ('PN', 'PCN', 'Pitcairn', ['Pitcairn Islands']),
+    ('PW', 'PLW', 'Palau', []),
+    ('SB', 'SLB', 'Solomon Islands', []),
+    ('TK', 'TKL', 'Tokelau', []),
+    ('TO', 'TON', 'Tonga', []),
+    ('TV', 'TUV', 'Tuvalu', []),
+    ('VU', 'VUT', 'Vanuatu', []),
+    ('WF', 'WLF', 'Wallis and Futuna', ['Wallis and Futuna Islands']),
+    ('WS', 'WSM', 'Samoa', []),
+]
+
+
+def _name_key(name):
+    # Case, punctuation and spacing do not matter when matching names
+    return ' '.join(re.findall(r'[a-z0-9]+', str(name).casefold()))
+
+
+class CountryIndex:
+    # Dense ids for the curated countries above, extended with every other
+    # (code, name) pair a source brings (e.g. the World Bank aggregates).
+    # Ids are only ever appended, so they stay valid for the process.
+
+    def __init__(self, table=PACIFIC_COUNTRIES):
+        self.names = []
+        self._by_code = {}
+        self._by_name = {}
+        self._lock = threading.Lock()
+        for iso2, iso3, name, aliases in table:
+            self._add(name, [iso2, iso3], aliases)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add(self, name, codes, aliases=()):
+        country_id = len(self.names)
+        self.names.append(name)
+        for code in codes:
+            self._by_code.setdefault(code.upper(), country_id)
+        for alias in [name, *aliases]:
+            self._by_name.setdefault(_name_key(alias), country_id)
+        return country_id
+
+    def _resolve(self, code, name):
+        # Code first, then name; a pair matching neither becomes a new country
+        code = str(code).strip().upper() if code is not None else None
+        country_id = self._by_code.get(code) if code else None
+        if country_id is None and name is not None:
+            country_id = self._by_name.get(_name_key(name))
+        if country_id is None:
+            return self._add(str(name).strip() if name is not None else code, [code] if code else [])
+        # Remember how this source spells it
+        if code:
+            self._by_code.setdefault(code, country_id)
+        if name is not None:
+            self._by_name.setdefault(_name_key(name), country_id)
+        return country_id
+
+    def lookup(self, codes=None, names=None):
+        # int32 ids for parallel arrays of codes and/or names; each distinct
+        # (code, name) pair is resolved once, the rest is array indexing
+        n = len(codes) if codes is not None else len(names)
+        code_labels, code_values = pd.factorize(codes) if codes is not None else (np.full(n, -1), [])
+        name_labels, name_values = pd.factorize(names) if names is not None else (np.full(n, -1), [])
+        # Labels are -1 for missing values
+        width = len(name_values) + 1
+        pairs, inverse = np.unique((code_labels + 1) * width + (name_labels + 1), return_inverse=True)
+        resolved = np.empty(len(pairs), dtype=np.int32)
+        with self._lock:
+            for k, pair in enumerate(pairs):
+                code_pos, name_pos = divmod(int(pair), width)
+                resolved[k] = self._resolve(
+                    code_values[code_pos - 1] if code_pos else None,
+                    name_values[name_pos - 1] if name_pos else None
+                )
+        return resolved[inverse.reshape(-1)]
+
+
+@st.cache_resource(show_spinner=False)
+def country_index():
+    # One index per process, so ids agree between every loaded source
+    return CountryIndex()
+
+
+def country_ids(df):
+    # Country ids of a frame's rows, from its 'Country Code' column (GEO_PICT
+    # or ISO3) where it has one, and its 'Country' names
+    codes = df['Country Code'] if 'Country Code' in df.columns else None
+    return country_index().lookup(codes, df['Country'])
+
+
+def align(left_ids, left_years, right_ids, right_years, right_values):
+    # For every left row, the right value at the same (country_id, year) and
+    # whether there is one. Right keys are unique (one value per country and
+    # year); the lookup goes through a dense [country_id, year] grid.
+    left_years = np.asarray(left_years, dtype=np.int64)
+    right_years = np.asarray(right_years, dtype=np.int64)
+    values = np.full(len(left_ids), np.nan)
+    found = np.zeros(len(left_ids), dtype=bool)
+    if not len(left_ids) or not len(right_ids):
+        return values, found
+    first = min(left_years.min(), right_years.min())
+    shape = (max(left_ids.max(), right_ids.max()) + 1, max(left_years.max(), right_years.max()) - first + 1)
+    grid = np.full(shape, np.nan)
+    present = np.zeros(shape, dtype=bool)
+    grid[right_ids, right_years - first] = right_values
+    present[right_ids, right_years - first] = True
+    return grid[left_ids, left_years - first], present[left_ids, left_years - first]
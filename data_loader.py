@@ -0,0 +1,476 @@
+import json
+import os
+import sys
+import pandas as pd
+import streamlit as st
+from countries import align, country_ids
+from data_store import Cube, DataStore, Rollup, TableIndex
+from forecast import TrendModel
+from memo import LRUCache
+from registry import dataset_registry, view
+from star import TOTAL_BREAKDOWN, VALUE_COLUMN, YEAR_COLUMN, StarSchema, source_columns
+
+# Shared ingestion layer for app_gabungan.py, visdat.py and dataviz.py.
+# The Blue Pacific CSV is parsed once per process into a star schema
+# (star.py) and every script/section gets views of the long frame derived
+# from it instead of calling pd.read_csv again.
+#
+# Both sources are also normalized into a typed, columnar cache on disk
+# (.cache/*.feather), built with `python data_loader.py build` or on the
+# first load. A fresh worker memory-maps the cache and only falls back to
+# the CSV when the cache was built from other source files, or from other
+# versions of them.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
+BLUE_PACIFIC_FILE = os.path.join(BASE_DIR, 'Blue Pacific 2050_ Climate Change And Disasters (Thematic Area 5) data.csv')
+CO2_FILENAMES = [
+    os.path.join(BASE_DIR, 'API_EN.GHG.CO2.MT.CE.AR5_DS2_en_csv_v2_3349.csv'),
+    os.path.join(BASE_DIR, 'API_EN.GHG.CO2.MT.CE.AR5_DS2_en_csv_v2_3349/API_EN.GHG.CO2.MT.CE.AR5_DS2_en_csv_v2_3349.csv'),
+    r'C:\Users\Lenovo\Downloads\API_EN.GHG.CO2.MT.CE.AR5_DS2_en_csv_v2_3349\API_EN.GHG.CO2.MT.CE.AR5_DS2_en_csv_v2_3349.csv'
+]
+CO2_VALUE_COL = 'CO2 Emissions (Mt CO2e)'
+CO2_DATAFLOW = 'EN.GHG.CO2.MT.CE.AR5'
+DISASTER_INDICATOR = 'Number of people affected by disaster'
+RENEWABLE_INDICATOR = 'Installed renewable electricity-generating capacity (watts per capita)'
+
+# Copy-on-Write lets all sessions share the cached frames: a section that
+# modifies its view gets a private copy instead of corrupting the cache.
+pd.set_option('mode.copy_on_write', True)
+
+
+def file_fingerprint(path):
+    # mtime + size changes whenever the file is replaced or edited, and is
+    # cheap enough to check on every rerun (no need to hash the whole file)
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def dataset_version(*extra_paths):
+    # Identifies the data behind a derived result; changes with any source file
+    return (CACHE_VERSION, file_fingerprint(BLUE_PACIFIC_FILE)) + tuple(file_fingerprint(path) for path in extra_paths if path)
+
+
+def find_co2_file():
+    for fname in CO2_FILENAMES:
+        if os.path.exists(fname):
+            return fname
+    # Any other release of the World Bank file in the data directories
+    from catalog import load_catalog
+    entry = load_catalog().entries.get(CO2_DATAFLOW)
+    return entry['path'] if entry else None
+
+
+# --- CSV PARSING ---
+# Columns are parsed straight into their final dtypes. The SDMX code/label
+# columns are read as dictionaries, so the long free-text fields
+# (DATA_SOURCE, OBS_COMMENT, ...) are materialized once per distinct value.
+WORLDBANK_ID_COLUMNS = {
+    'Country Name': 'category',
+    'Country Code': 'category'
+}
+
+
+def _arrow_type(dtype):
+    import pyarrow as pa
+    return {
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'Int16': pa.int16(),
+        'float64': pa.float64()
+    }[dtype]
+
+
+def read_csv_columns(path, dtypes, skiprows=0):
+    # Prefer pyarrow's multithreaded parser; pandas' own engine='pyarrow' can not
+    # be used because the SDMX indicator labels contain quoted newlines
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa = None
+    if pa is not None:
+        try:
+            table = pa_csv.read_csv(
+                path,
+                read_options=pa_csv.ReadOptions(skip_rows=skiprows),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=list(dtypes),
+                    column_types={col: _arrow_type(dtype) for col, dtype in dtypes.items()}
+                )
+            )
+            return table.to_pandas()
+        except (pa.ArrowInvalid, KeyError):
+            pass
+    return pd.read_csv(path, skiprows=skiprows, usecols=list(dtypes), dtype=dtypes)
+
+
+# --- NORMALIZATION (CSV -> typed long table) ---
+def _clean_categories(series):
+    # Strip labels and keep categories sorted, so groupbys order groups the
+    # same way regardless of which parser built the categorical
+    series = series.cat.rename_categories(lambda name: name.strip())
+    return series.cat.reorder_categories(sorted(series.cat.categories))
+
+
+def normalize_star(path):
+    # SDMX CSV -> StarSchema of dimension tables and integer facts
+    header = pd.read_csv(path, nrows=0).columns
+    numeric = {YEAR_COLUMN: 'Int16', VALUE_COLUMN: 'float64'}
+    df = read_csv_columns(path, {col: numeric.get(col, 'category') for col in source_columns(header)})
+    return StarSchema.from_sdmx(df)
+
+
+def normalize_blue_pacific(path):
+    return normalize_star(path).to_frame()
+
+
+def normalize_worldbank(path, value_name='Value'):
+    # World Bank API_* download (one indicator, a column per year) ->
+    # Country/Country Code/Year/value rows
+    header = pd.read_csv(path, skiprows=4, nrows=0).columns
+    year_cols = [col for col in header if col.isdigit()]
+    df_wide = read_csv_columns(path, {**WORLDBANK_ID_COLUMNS, **{year: 'float64' for year in year_cols}}, skiprows=4)
+    df_long = df_wide.melt(
+        id_vars=['Country Name', 'Country Code'],
+        value_vars=year_cols,
+        var_name='Year',
+        value_name=value_name
+    )
+    df_long = df_long.rename(columns={'Country Name': 'Country'})
+    df_long['Country'] = _clean_categories(df_long['Country'])
+    df_long['Country Code'] = _clean_categories(df_long['Country Code'])
+    return df_long.astype({'Year': 'int16'})
+
+
+def normalize_co2(path):
+    return normalize_worldbank(path, CO2_VALUE_COL)
+
+
+# --- DERIVED TABLES ---
+# Joined on (country_id, year) from countries.py, so SPC and World Bank
+# spellings of the same country match
+def _co2_for(df, df_co2_long):
+    return align(
+        country_ids(df), df['Year'].to_numpy(),
+        country_ids(df_co2_long), df_co2_long['Year'].to_numpy(), df_co2_long[CO2_VALUE_COL].to_numpy()
+    )
+
+
+def merge_co2(df, df_co2_long):
+    # Renewable rows with the CO2 emissions of the same country and year
+    values, _ = _co2_for(df, df_co2_long)
+    return df.assign(**{CO2_VALUE_COL: values}).reset_index(drop=True)
+
+
+def merge_impact(df_disaster, df_co2_long):
+    # People affected by disaster next to CO2 emissions, only where both exist
+    values, found = _co2_for(df_disaster, df_co2_long)
+    return df_disaster[found].assign(**{CO2_VALUE_COL: values[found]}).reset_index(drop=True)
+
+
+# --- COLUMNAR CACHE ---
+# Bump when normalization or a derived table changes shape, so caches
+# written by an older version of this module are never read back
+CACHE_VERSION = 4
+
+
+def _cache_path(name):
+    return os.path.join(CACHE_DIR, f'{name}-v{CACHE_VERSION}.feather')
+
+
+def _sources(source_paths):
+    # Which files, in which version, a cache file was built from; stored in
+    # the file so a cache of another path or release is never read back
+    return json.dumps([[os.path.abspath(path), *file_fingerprint(path)] for path in source_paths]).encode('utf-8')
+
+
+def _write_cache(df, name, source_paths):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(name)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'sources': _sources(source_paths)})
+    # Uncompressed so the file can be memory-mapped instead of decoded
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_cache(name, source_paths):
+    # None if there is no cache or it was built from other sources
+    import pyarrow.feather as feather
+    path = _cache_path(name)
+    if not os.path.exists(path):
+        return None
+    table = feather.read_table(path, memory_map=True)
+    if (table.schema.metadata or {}).get(b'sources') != _sources(source_paths):
+        return None
+    return table.to_pandas(split_blocks=True)
+
+
+def _load_cached(name, source_paths, build):
+    try:
+        df = _read_cache(name, source_paths)
+    except Exception:
+        df = None
+    if df is not None:
+        return df
+    df = build()
+    try:
+        _write_cache(df, name, source_paths)
+    except Exception:
+        # A read-only checkout still works, it just rebuilds every cold start
+        pass
+    return df
+
+
+def _write_star_cache(star, name, source_paths):
+    # One file per table: '<name>.facts', '<name>.country', ...
+    return [_write_cache(table, f'{name}.{table_name}', source_paths) for table_name, table in star.tables().items()]
+
+
+def _load_cached_star(name, source_paths, build):
+    try:
+        tables = {table_name: _read_cache(f'{name}.{table_name}', source_paths) for table_name in StarSchema.TABLES}
+    except Exception:
+        tables = {}
+    if tables and all(table is not None for table in tables.values()):
+        return StarSchema.from_tables(tables)
+    star = build()
+    try:
+        _write_star_cache(star, name, source_paths)
+    except Exception:
+        pass
+    return star
+
+
+def build_cache():
+    star = normalize_star(BLUE_PACIFIC_FILE)
+    df_blue_pacific = star.to_frame()
+    paths = _write_star_cache(star, 'blue_pacific', [BLUE_PACIFIC_FILE])
+    co2_path = find_co2_file()
+    if co2_path:
+        df_co2_long = normalize_co2(co2_path)
+        both = [BLUE_PACIFIC_FILE, co2_path]
+        paths.append(_write_cache(df_co2_long, 'co2', [co2_path]))
+        paths.append(_write_cache(merge_co2(_renewable_frame(df_blue_pacific), df_co2_long), 'merged', both))
+        paths.append(_write_cache(merge_impact(_indicator_frame(df_blue_pacific, DISASTER_INDICATOR), df_co2_long), 'impact', both))
+    return paths
+
+
+def _renewable_frame(df):
+    # Renewable capacity of all types of renewable energy together (the
+    # indicator's total breakdown), not every indicator and breakdown pooled
+    df = df[(df['Indicator'] == RENEWABLE_INDICATOR) & (df['Breakdown'] == TOTAL_BREAKDOWN)]
+    df = df[['Country', 'Year', 'Value', 'Indicator']].rename(columns={'Value': 'Renewable Capacity (W/capita)'})
+    df = df.assign(Country=df['Country'].cat.remove_unused_categories(), Indicator=df['Indicator'].cat.remove_unused_categories())
+    return df.dropna(subset=['Renewable Capacity (W/capita)']).reset_index(drop=True)
+
+
+def _indicator_frame(df, indicator):
+    # Rows of one indicator at its total breakdown, like _renewable_frame
+    view = df[(df['Indicator'] == indicator) & (df['Breakdown'] == TOTAL_BREAKDOWN)]
+    return view.assign(Country=view['Country'].cat.remove_unused_categories())
+
+
+# --- RUNTIME LOADERS ---
+# Every loader is keyed on the fingerprints of the files it is derived
+# from, so results are shared by all sessions until a source changes.
+# Frames are registered (and frozen) in the dataset registry and the
+# public loaders hand out views of them, never copies.
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_star(path, fingerprint):
+    star = _load_cached_star('blue_pacific', [path], lambda: normalize_star(path))
+    registry = dataset_registry()
+    registry.add('blue_pacific_facts', star.facts)
+    for name, table in star.dimensions.items():
+        registry.add(f'blue_pacific_{name}', table)
+    return star
+
+
+def load_star(path=BLUE_PACIFIC_FILE):
+    # Dimension tables and integer fact table of the Blue Pacific CSV; the
+    # tables are frozen, so the schema is shared as is
+    return _load_star(path, file_fingerprint(path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_blue_pacific(path, fingerprint):
+    return dataset_registry().add('blue_pacific', _load_star(path, fingerprint).to_frame())
+
+
+def load_blue_pacific(path=BLUE_PACIFIC_FILE):
+    return view(_load_blue_pacific(path, file_fingerprint(path)))
+
+
+def _unregister_indicator(key, df):
+    # Evicted: the registry must not keep the buffers alive either
+    dataset_registry().remove(f'indicator:{key[2]}', df)
+
+
+@st.cache_resource(show_spinner=False)
+def indicator_cache():
+    # Rows of one indicator per (path, fingerprint, indicator), least
+    # recently used evicted first
+    return LRUCache(max_entries=32, on_evict=_unregister_indicator)
+
+
+def _indicator_view(path, fingerprint, indicator):
+    return indicator_cache().get_or_compute((path, fingerprint, indicator), lambda: dataset_registry().add(
+        f'indicator:{indicator}', _indicator_frame(_load_blue_pacific(path, fingerprint), indicator)
+    ))
+
+
+def indicator_view(indicator, path=BLUE_PACIFIC_FILE):
+    # Read-only rows of one indicator at its total breakdown, shared by every
+    # section and session
+    return view(_indicator_view(path, file_fingerprint(path), indicator))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_data(path, fingerprint):
+    return dataset_registry().add('renewable', _renewable_frame(_load_blue_pacific(path, fingerprint)))
+
+
+def load_data(path=BLUE_PACIFIC_FILE):
+    return view(_load_data(path, file_fingerprint(path)))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_store(path, fingerprint):
+    df = _load_blue_pacific(path, fingerprint)
+    return DataStore(df[df['Breakdown'] == TOTAL_BREAKDOWN].dropna(subset=['Value']), ['Value'])
+
+
+def load_store(path=BLUE_PACIFIC_FILE):
+    # Indicator/country partitioned index over the normalized Blue Pacific
+    # rows of every indicator at its total breakdown
+    return _load_store(path, file_fingerprint(path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_table_index(path, fingerprint):
+    return TableIndex(_load_data(path, fingerprint), 'Renewable Capacity (W/capita)')
+
+
+def load_table_index(path=BLUE_PACIFIC_FILE):
+    # Filter options, slider bounds and row sets of the data table
+    return _load_table_index(path, file_fingerprint(path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_rollup(path, fingerprint):
+    return Rollup(_load_blue_pacific(path, fingerprint), 'Value', TOTAL_BREAKDOWN)
+
+
+def load_rollup(path=BLUE_PACIFIC_FILE):
+    # Country x year cube of every indicator and breakdown
+    return _load_rollup(path, file_fingerprint(path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_cubes(path, fingerprint):
+    return _load_rollup(path, fingerprint).totals()
+
+
+def load_cubes(path=BLUE_PACIFIC_FILE):
+    # Country x year cube of every indicator at its total breakdown, keyed by
+    # indicator name
+    return _load_cubes(path, file_fingerprint(path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_trends(path, fingerprint):
+    return {indicator: TrendModel(cube) for indicator, cube in _load_cubes(path, fingerprint).items()}
+
+
+def load_trends(path=BLUE_PACIFIC_FILE):
+    # Linear trend fits over the yearly means of every cube, same keys as load_cubes
+    return _load_trends(path, file_fingerprint(path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_co2_long(co2_path, co2_fingerprint):
+    return dataset_registry().add('co2', _load_cached('co2', [co2_path], lambda: normalize_co2(co2_path)))
+
+
+def load_co2_long(co2_path):
+    # Country, Country Code, Year, CO2 Emissions (Mt CO2e) in long format.
+    # A file the catalog knows is loaded as its dataflow, so it shares the
+    # byte-bounded dataflow cache; one outside the data directories (e.g.
+    # in Downloads) has a cache entry of its own.
+    from catalog import load_catalog, load_dataflow
+    catalog = load_catalog()
+    entry = catalog.entries.get(CO2_DATAFLOW)
+    if entry is not None and entry['path'] == os.path.abspath(co2_path):
+        return load_dataflow(CO2_DATAFLOW, catalog).rename(columns={'Value': CO2_VALUE_COL})
+    return view(_load_co2_long(co2_path, file_fingerprint(co2_path)))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_merged(path, fingerprint, co2_path, co2_fingerprint):
+    return dataset_registry().add('merged', _load_cached('merged', [path, co2_path], lambda: merge_co2(
+        _load_data(path, fingerprint),
+        load_co2_long(co2_path)
+    )))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_merged_store(path, fingerprint, co2_path, co2_fingerprint):
+    df_merged = _load_merged(path, fingerprint, co2_path, co2_fingerprint)
+    return DataStore(df_merged, ['Renewable Capacity (W/capita)', CO2_VALUE_COL])
+
+
+def load_merged_store(co2_path, path=BLUE_PACIFIC_FILE):
+    # Store over load_data() left-joined with CO2 emissions on (Country, Year)
+    return _load_merged_store(path, file_fingerprint(path), co2_path, file_fingerprint(co2_path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_co2_cube(path, fingerprint, co2_path, co2_fingerprint):
+    # Built from the joined rows, so each country-year is weighted the same
+    # way as a groupby over the merged frame
+    return Cube(_load_merged(path, fingerprint, co2_path, co2_fingerprint), CO2_VALUE_COL)
+
+
+def load_co2_cube(co2_path, path=BLUE_PACIFIC_FILE):
+    return _load_co2_cube(path, file_fingerprint(path), co2_path, file_fingerprint(co2_path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_impact(path, fingerprint, co2_path, co2_fingerprint):
+    return dataset_registry().add('impact', _load_cached('impact', [path, co2_path], lambda: merge_impact(
+        _indicator_view(path, fingerprint, DISASTER_INDICATOR),
+        load_co2_long(co2_path)
+    )))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_impact_store(path, fingerprint, co2_path, co2_fingerprint):
+    return DataStore(_load_impact(path, fingerprint, co2_path, co2_fingerprint), ['Value', CO2_VALUE_COL])
+
+
+def load_impact_store(co2_path, path=BLUE_PACIFIC_FILE):
+    # Store over the disaster rows inner-joined with CO2 emissions
+    return _load_impact_store(path, file_fingerprint(path), co2_path, file_fingerprint(co2_path))
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_impact_cubes(path, fingerprint, co2_path, co2_fingerprint):
+    df_impact = _load_impact(path, fingerprint, co2_path, co2_fingerprint)
+    return {value_col: Cube(df_impact, value_col) for value_col in ['Value', CO2_VALUE_COL]}
+
+
+def load_impact_cubes(co2_path, path=BLUE_PACIFIC_FILE):
+    # People affected ('Value') and CO2 cubes over the same joined rows
+    return _load_impact_cubes(path, file_fingerprint(path), co2_path, file_fingerprint(co2_path))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['build']:
+        sys.exit('usage: python data_loader.py build')
+    for cache_file in build_cache():
+        print(cache_file)
@@ -0,0 +1,249 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+class DataStore:
+    # Rows partitioned by (indicator, country) and pre-sorted by year, built
+    # once at load time. A selection is a dict lookup per country plus a
+    # binary search on year, so filter cost scales with the selection
+    # instead of with the total number of rows.
+
+    def __init__(self, df, value_cols):
+        self.value_cols = list(value_cols)
+        df = df.sort_values(['Indicator', 'Country', 'Year'], kind='stable').reset_index(drop=True)
+        self._frame = df
+        self._years = df['Year'].to_numpy()
+        self._partitions = {}
+        for (indicator, country), positions in df.groupby(['Indicator', 'Country'], observed=True, sort=False).indices.items():
+            # Rows of one partition are contiguous after the sort
+            self._partitions[(indicator, country)] = (positions[0], positions[-1] + 1)
+        self.indicators = sorted({indicator for indicator, _ in self._partitions})
+
+    def __len__(self):
+        return len(self._frame)
+
+    def countries(self, indicator=None):
+        return sorted({country for ind, country in self._partitions if indicator is None or ind == indicator})
+
+    def positions(self, indicator=None, countries=None, year_range=None):
+        indicators = self.indicators if indicator is None else [indicator]
+        if countries is None:
+            countries = self.countries(indicator)
+        pieces = []
+        for ind in indicators:
+            for country in countries:
+                partition = self._partitions.get((ind, country))
+                if partition is None:
+                    continue
+                start, stop = partition
+                if year_range is not None:
+                    years = self._years[start:stop]
+                    start, stop = (
+                        start + np.searchsorted(years, year_range[0], side='left'),
+                        start + np.searchsorted(years, year_range[1], side='right')
+                    )
+                if stop > start:
+                    pieces.append(np.arange(start, stop))
+        return np.concatenate(pieces) if pieces else np.empty(0, dtype=np.intp)
+
+    def slice(self, indicator=None, countries=None, year_range=None):
+        # indicator=None spans every indicator, countries=None every country,
+        # year_range is an inclusive (first, last) pair
+        return self._frame.take(self.positions(indicator, countries, year_range))
+
+
+class Cube:
+    # Dense [country, year] aggregates of one value column, computed once at
+    # ingest. Charts and insight text read slices of these planes instead of
+    # running a pandas groupby per request.
+
+    def __init__(self, df, value_col):
+        country_codes, countries = pd.factorize(df['Country'].astype(str), sort=True)
+        years = df['Year'].to_numpy(dtype=np.int64)
+        values = df[value_col].to_numpy(dtype=np.float64)
+        self.value_col = value_col
+        self.countries = np.asarray(countries, dtype=object)
+        self.years = np.arange(years.min(), years.max() + 1) if len(years) else np.empty(0, dtype=np.int64)
+        self._country_pos = {country: pos for pos, country in enumerate(self.countries)}
+        shape = (len(self.countries), len(self.years))
+
+        # `rows` also counts rows whose value is missing: like a groupby, a
+        # country-year with only missing values still exists (its mean is NaN)
+        rows = np.zeros(shape)
+        count = np.zeros(shape)
+        total = np.zeros(shape)
+        low = np.full(shape, np.inf)
+        high = np.full(shape, -np.inf)
+        if len(years):
+            cells = (country_codes, years - self.years[0])
+            valid = ~np.isnan(values)
+            valid_cells = (cells[0][valid], cells[1][valid])
+            np.add.at(rows, cells, 1)
+            np.add.at(count, valid_cells, 1)
+            np.add.at(total, valid_cells, values[valid])
+            np.minimum.at(low, valid_cells, values[valid])
+            np.maximum.at(high, valid_cells, values[valid])
+        empty = count == 0
+        low[empty] = np.nan
+        high[empty] = np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(empty, np.nan, total / count)
+        self.planes = {'rows': rows, 'count': count, 'sum': total, 'min': low, 'max': high, 'mean': mean}
+        # Sorted raw values, for order statistics that the planes can not give
+        self._sorted_values = np.sort(values[~np.isnan(values)])
+
+    def _rows(self, countries):
+        if countries is None:
+            return np.arange(len(self.countries))
+        return np.array(sorted(self._country_pos[c] for c in set(countries) if c in self._country_pos), dtype=np.intp)
+
+    def _cols(self, year_range):
+        if year_range is None:
+            return slice(0, len(self.years))
+        return slice(
+            np.searchsorted(self.years, year_range[0], side='left'),
+            np.searchsorted(self.years, year_range[1], side='right')
+        )
+
+    def select(self, stat, countries=None, year_range=None):
+        # (countries, years, plane[country, year]) for the selection, O(selection)
+        rows, cols = self._rows(countries), self._cols(year_range)
+        return self.countries[rows], self.years[cols], self.planes[stat][rows, cols]
+
+    def to_frame(self, stat='mean', countries=None, year_range=None, value_name=None):
+        # Long Year/Country/value rows for the non-empty cells, ordered like
+        # groupby(['Year', 'Country']) output
+        countries_sel, years_sel, values = self.select(stat, countries, year_range)
+        _, _, rows = self.select('rows', countries, year_range)
+        year_idx, country_idx = np.nonzero(rows.T > 0)
+        return pd.DataFrame({
+            'Year': years_sel[year_idx],
+            'Country': countries_sel[country_idx],
+            value_name or self.value_col: values.T[year_idx, country_idx]
+        })
+
+    def by_country(self, stat, countries=None, year_range=None, plane=None):
+        # Aggregate over the selected years, one value per country with data
+        return self._reduce(stat, countries, year_range, plane, axis=1)
+
+    def by_year(self, stat, countries=None, year_range=None, plane=None):
+        # Aggregate over the selected countries, one value per year with data
+        return self._reduce(stat, countries, year_range, plane, axis=0)
+
+    def _reduce(self, stat, countries, year_range, plane, axis):
+        # Without `plane` the raw rows are combined (e.g. mean = sum / count);
+        # with it, `stat` is taken over that plane's cells (e.g. the highest
+        # yearly mean is stat='max', plane='mean')
+        countries_sel, years_sel, count = self.select('count', countries, year_range)
+        index = pd.Index(countries_sel if axis == 1 else years_sel, name='Country' if axis == 1 else 'Year')
+        has_data = self.select('rows', countries, year_range)[2].sum(axis=axis) > 0
+        if count.shape[axis] == 0:
+            return pd.Series(np.empty(0), index=index[:0], name=self.value_col)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if plane is not None:
+                cells = self.select(plane, countries, year_range)[2]
+                reduced = {'sum': np.nansum, 'min': np.nanmin, 'max': np.nanmax, 'mean': np.nanmean}[stat](cells, axis=axis)
+            elif stat == 'mean':
+                reduced = self.select('sum', countries, year_range)[2].sum(axis=axis) / count.sum(axis=axis)
+            else:
+                cells = self.select(stat, countries, year_range)[2]
+                reduced = {'count': np.sum, 'sum': np.sum, 'min': np.nanmin, 'max': np.nanmax}[stat](cells, axis=axis)
+        return pd.Series(reduced[has_data], index=index[has_data], name=self.value_col)
+
+    def total(self, stat):
+        # Aggregate over every row the cube was built from
+        count = self.planes['count'].sum()
+        if stat == 'mean':
+            return self.planes['sum'].sum() / count if count else np.nan
+        if stat == 'median':
+            return np.median(self._sorted_values) if count else np.nan
+        return {'count': np.sum, 'sum': np.sum, 'min': np.nanmin, 'max': np.nanmax}[stat](self.planes[stat])
+
+
+class Rollup:
+    # The indicator x breakdown x country x year lattice, precomputed at
+    # ingest as one Cube per (indicator, breakdown); each cube rolls its
+    # country x year cells up per country, per year and overall. Values are
+    # never pooled across indicators or across the members of a breakdown:
+    # the all-members level is the source's own total breakdown row.
+
+    def __init__(self, df, value_col, total_label='Total'):
+        self.total_label = total_label
+        self._cubes = {}
+        for (indicator, breakdown), rows in df.groupby(['Indicator', 'Breakdown'], observed=True, sort=True):
+            self._cubes[indicator, breakdown] = Cube(rows, value_col)
+        self.indicators = sorted({indicator for indicator, _ in self._cubes})
+
+    def breakdowns(self, indicator):
+        # Breakdown labels of an indicator, its total first
+        return sorted((breakdown for ind, breakdown in self._cubes if ind == indicator), key=lambda label: (label != self.total_label, label))
+
+    def cube(self, indicator, breakdown=None):
+        # breakdown=None is the indicator's total
+        return self._cubes[indicator, self.total_label if breakdown is None else breakdown]
+
+    def totals(self):
+        # Total-breakdown cube of every indicator that has one
+        return {indicator: cube for (indicator, breakdown), cube in self._cubes.items() if breakdown == self.total_label}
+
+
+class TableIndex:
+    # Server-side index for the filterable data table. For every
+    # (country, year) filter combination, '(All)' included, it keeps the rows
+    # left after de-duplicating the value column, the year options and the
+    # value slider bounds. A request is a dict lookup plus, for a narrowed
+    # value range, one vectorized mask; only the visible page is taken from
+    # the frame.
+
+    def __init__(self, df, value_col, all_label='(All)'):
+        self.value_col = value_col
+        self.all_label = all_label
+        self._frame = df
+        values = df[value_col].to_numpy(dtype=np.float64)
+        self._values = values
+        combos = {(all_label, all_label): np.arange(len(df))}
+        for keys, positions in df.groupby(['Country', 'Year'], observed=True).indices.items():
+            combos[keys[0], int(keys[1])] = positions
+        for country, positions in df.groupby('Country', observed=True).indices.items():
+            combos[country, all_label] = positions
+        for year, positions in df.groupby('Year', observed=True).indices.items():
+            combos[all_label, int(year)] = positions
+
+        self._rows = {}
+        self._bounds = {}
+        self._years = {all_label: [all_label] + [int(year) for year in np.unique(df['Year'].dropna().to_numpy())]}
+        for key, positions in combos.items():
+            positions = np.sort(positions)
+            combo_values = values[positions]
+            # First row of each distinct value, in frame order (drop_duplicates)
+            _, first = np.unique(combo_values, return_index=True)
+            self._rows[key] = positions[np.sort(first)]
+            finite = combo_values[~np.isnan(combo_values)]
+            self._bounds[key] = (float(finite.min()), float(finite.max())) if len(finite) else (np.nan, np.nan)
+            if key[1] == all_label and key[0] != all_label:
+                self._years[key[0]] = [all_label] + [int(year) for year in np.unique(df['Year'].to_numpy()[positions])]
+        self.countries = [all_label] + sorted(self._years.keys() - {all_label})
+
+    def years(self, country):
+        # Year options once `country` is picked
+        return self._years.get(country, [self.all_label])
+
+    def bounds(self, country, year):
+        # Value slider (min, max) once country and year are picked
+        return self._bounds.get((country, year), (np.nan, np.nan))
+
+    def positions(self, country, year, value_range=None):
+        # Frame positions of the table rows, in frame order
+        rows = self._rows.get((country, year), np.empty(0, dtype=np.intp))
+        if value_range is None or tuple(value_range) == self.bounds(country, year):
+            return rows
+        row_values = self._values[rows]
+        return rows[(row_values >= value_range[0]) & (row_values <= value_range[1])]
+
+    def page(self, positions, page, page_size):
+        # Rows of one 1-based page of `positions`
+        start = (page - 1) * page_size
+        return self._frame.take(positions[start:start + page_size])
@@ -1,45 +1,24 @@
 import streamlit as st
 import plotly.express as px
 import numpy as np
-import os
-import matplotlib.pyplot as plt
+from data_loader import DISASTER_INDICATOR, RENEWABLE_INDICATOR, dataset_version, find_co2_file, indicator_view, load_blue_pacific, load_co2_cube, load_cubes, load_data, load_merged_store, load_store
+from export import export_bytes
+from insights import country_summary, regional_summary
+from memo import memoize_filter
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    file_path = 'Blue Pacific 2050_ Climate Change And Disasters (Thematic Area 5) data.csv'
-    df = pd.read_csv(file_path)
-    cols = ['Pacific Island Countries and territories', 'TIME_PERIOD', 'OBS_VALUE']
-    df = df[cols]
-    df = df.rename(columns={
-        'Pacific Island Countries and territories': 'Country',
-        'TIME_PERIOD': 'Year',
-        'OBS_VALUE': 'Renewable Capacity (W/capita)'
-    })
-    df = df.dropna(subset=['Year', 'Renewable Capacity (W/capita)'])
-    df['Year'] = df['Year'].astype(int)
-    df['Renewable Capacity (W/capita)'] = df['Renewable Capacity (W/capita)'].astype(float)
-    return df
-
 df = load_data()
+store = load_store()
+cubes = load_cubes()
 countries = sorted(df['Country'].unique())
 
 # Load dan transformasi data emisi CO2
-co2_path = 'API_EN.GHG.CO2.MT.CE.AR5_DS2_en_csv_v2_3349.csv'
-df_co2 = None
-df_merged = None
-if os.path.exists(co2_path):
-    df_co2 = pd.read_csv(co2_path, skiprows=4)
-    df_co2_long = df_co2.melt(
-        id_vars=['Country Name'],
-        var_name='Year',
-        value_name='CO2 Emissions (Mt CO2e)'
-    )
-    df_co2_long = df_co2_long.rename(columns={'Country Name': 'Country'})
-    df_co2_long['Year'] = pd.to_numeric(df_co2_long['Year'], errors='coerce')
-    df_co2_long = df_co2_long.dropna(subset=['Year'])
+co2_path = find_co2_file()
+data_version = dataset_version(co2_path)
+if co2_path:
     # Gabungkan dengan data utama (df)
-    df_merged = pd.merge(df, df_co2_long, on=['Country', 'Year'], how='left')
+    merged_store = load_merged_store(co2_path)
+    co2_cube = load_co2_cube(co2_path)
 else:
     st.warning("File data emisi CO₂ tidak ditemukan di folder project.")
 
@@ -81,9 +60,9 @@ st.markdown("Tren ini menunjukkan upaya transisi energi bersih di negara-negara
 vis1_countries = st.multiselect('Pilih negara (visualisasi 1)', countries, default=countries, key='v1-country')
 vis1_year_min, vis1_year_max = int(df['Year'].min()), int(df['Year'].max())
 vis1_years = st.slider('Pilih rentang tahun (visualisasi 1)', vis1_year_min, vis1_year_max, (vis1_year_min, vis1_year_max), key='v1-year')
-vis1_filtered = df[(df['Country'].isin(vis1_countries)) & (df['Year'] >= vis1_years[0]) & (df['Year'] <= vis1_years[1])]
+grouped = memoize_filter('v1', data_version, vis1_countries, vis1_years, lambda: cubes[RENEWABLE_INDICATOR].to_frame('mean', vis1_countries, vis1_years, 'Renewable Capacity (W/capita)'))
 fig1 = px.line(
-    vis1_filtered.groupby(['Year', 'Country'], as_index=False).mean(),
+    grouped,
     x='Year',
     y='Renewable Capacity (W/capita)',
     color='Country',
@@ -98,15 +77,15 @@ Dari grafik di atas, kita dapat melihat negara mana yang paling aktif meningkatk
 """)
 
 # --- Visualisasi 2: Tren Emisi CO2 (jika data tersedia) ---
-if 'df_merged' in locals():
+if 'merged_store' in locals():
     vis2_countries = st.multiselect('Pilih negara (visualisasi 2)', countries, default=countries, key='v2-country')
     vis2_year_min, vis2_year_max = int(df['Year'].min()), int(df['Year'].max())
     vis2_years = st.slider('Pilih rentang tahun (visualisasi 2)', vis2_year_min, vis2_year_max, (vis2_year_min, vis2_year_max), key='v2-year')
-    filtered_merged = df_merged[(df_merged['Country'].isin(vis2_countries)) & (df_merged['Year'] >= vis2_years[0]) & (df_merged['Year'] <= vis2_years[1])]
+    grouped2 = memoize_filter('v2', data_version, vis2_countries, vis2_years, lambda: co2_cube.to_frame('mean', vis2_countries, vis2_years))
     st.subheader("Tren Emisi CO₂ per Negara")
     st.markdown("Tren ini memperlihatkan perubahan emisi CO₂ seiring waktu. Penurunan emisi dapat menjadi indikasi keberhasilan transisi energi terbarukan.")
     fig2 = px.line(
-        filtered_merged.groupby(['Year', 'Country'], as_index=False).mean(),
+        grouped2,
         x='Year',
         y='CO2 Emissions (Mt CO2e)',
         color='Country',
@@ -123,15 +102,15 @@ else:
     st.warning("Data emisi CO₂ tidak tersedia. Silakan pastikan file CO₂ sudah ada di folder project.")
 
 # --- Visualisasi 3: Scatter Plot Hubungan Renewable Capacity vs Emisi CO2 ---
-if 'df_merged' in locals():
+if 'merged_store' in locals():
     vis3_countries = st.multiselect('Pilih negara (visualisasi 3)', countries, default=countries, key='v3-country')
     vis3_year_min, vis3_year_max = int(df['Year'].min()), int(df['Year'].max())
     vis3_years = st.slider('Pilih rentang tahun (visualisasi 3)', vis3_year_min, vis3_year_max, (vis3_year_min, vis3_year_max), key='v3-year')
-    filtered_merged = df_merged[(df_merged['Country'].isin(vis3_countries)) & (df_merged['Year'] >= vis3_years[0]) & (df_merged['Year'] <= vis3_years[1])]
+    scatter_data = memoize_filter('v3', data_version, vis3_countries, vis3_years, lambda: merged_store.slice(countries=vis3_countries, year_range=vis3_years).dropna(subset=['CO2 Emissions (Mt CO2e)']))
     st.subheader("Korelasi Kapasitas Terbarukan & Emisi CO₂")
     st.markdown("Scatter plot berikut memperlihatkan hubungan langsung antara kapasitas listrik terbarukan dan emisi CO₂. Titik-titik mewakili negara-tahun.")
     fig3_scatter = px.scatter(
-        filtered_merged.dropna(subset=['CO2 Emissions (Mt CO2e)']),
+        scatter_data,
         x='Renewable Capacity (W/capita)',
         y='CO2 Emissions (Mt CO2e)',
         color='Country',
@@ -147,7 +126,7 @@ else:
 
 # --- Visualisasi 4: Data Table ---
 st.subheader("Tabel Data Eksplorasi Renewable Capacity per Negara & Tahun")
-filtered_table = df.copy()
+filtered_table = df
 col1, col2, col3 = st.columns(3)
 with col1:
     country_opt = ['(Semua)'] + sorted(filtered_table['Country'].unique().tolist())
@@ -161,16 +140,17 @@ with col2:
         filtered_table = filtered_table[filtered_table['Year'] == year_sel]
 with col3:
     min_val, max_val = float(filtered_table['Renewable Capacity (W/capita)'].min()), float(filtered_table['Renewable Capacity (W/capita)'].max())
-    value_range = st.slider('Filter Renewable Capacity (W/capita)', min_val, max_val, (min_val, max_val), key='table-value')
-    filtered_table = filtered_table[(filtered_table['Renewable Capacity (W/capita)'] >= value_range[0]) & (filtered_table['Renewable Capacity (W/capita)'] <= value_range[1])]
+    # Satu nilai saja (satu negara di satu tahun) tidak perlu difilter
+    if min_val < max_val:
+        value_range = st.slider('Filter Renewable Capacity (W/capita)', min_val, max_val, (min_val, max_val), key='table-value')
+        filtered_table = filtered_table[(filtered_table['Renewable Capacity (W/capita)'] >= value_range[0]) & (filtered_table['Renewable Capacity (W/capita)'] <= value_range[1])]
 st.dataframe(filtered_table)
 
 # 7. Download Data
 st.subheader("Download Data")
-csv = df.to_csv(index=False).encode('utf-8')
 st.download_button(
     label="Download CSV",
-    data=csv,
+    data=lambda frame=df: export_bytes('CSV', ('dataviz', data_version, None), lambda: frame),
     file_name='blue_pacific_2050_data.csv',
     mime='text/csv',
 )
@@ -179,10 +159,7 @@ st.download_button(
 st.title("Visualisasi Jumlah Orang Terdampak Bencana per Negara")
 
 # Baca data
-df = pd.read_csv(r'../Blue Pacific 2050_ Climate Change And Disasters (Thematic Area 5) data.csv')
-df.columns = df.columns.str.strip()
-if 'Pacific Island Countries and territories' in df.columns:
-    df = df.rename(columns={'Pacific Island Countries and territories': 'Country'})
+df = load_blue_pacific()
 
 # Otomatis cari kolom value dan year yang benar
 value_col = None
@@ -200,15 +177,15 @@ if value_col is None or year_col is None:
     st.error('Kolom nilai (Value/OBS_VALUE/Observation value) atau tahun (Year/TIME_PERIOD/Time) tidak ditemukan di dataset.')
 else:
     # Filter hanya indikator 'Number of people affected by disaster'
-    disaster_indicator = 'Number of people affected by disaster'
-    df_disaster = df[df['Indicator'] == disaster_indicator]
+    df_disaster = indicator_view(DISASTER_INDICATOR)
 
     if df_disaster.empty:
         st.warning('Tidak ada data orang terdampak bencana di dataset ini.')
     else:
         st.subheader('Grafik Jumlah Orang Terdampak Bencana per Negara (Total Seluruh Tahun)')
         # Hitung total orang terdampak per negara
-        total_per_country = df_disaster.groupby('Country')[value_col].sum().sort_values(ascending=False).reset_index()
+        ringkasan = regional_summary(cubes[DISASTER_INDICATOR])
+        total_per_country = ringkasan['by_country'].rename(value_col).reset_index()
         fig = px.bar(
             total_per_country,
             x='Country',
@@ -222,17 +199,16 @@ else:
         st.plotly_chart(fig, use_container_width=True)
 
         # --- INSIGHT OTOMATIS & STATISTIK RINGKAS ---
-        max_country = total_per_country.loc[total_per_country[value_col].idxmax(), 'Country']
-        max_value = int(total_per_country[value_col].max())
-        min_country = total_per_country.loc[total_per_country[value_col].idxmin(), 'Country']
-        min_value = int(total_per_country[value_col].min())
-        total_affected = int(df_disaster[value_col].sum())
-        mean_affected = int(df_disaster[value_col].mean())
-        median_affected = int(df_disaster[value_col].median())
+        max_country = ringkasan['top_country']
+        max_value = int(ringkasan['top_value'])
+        min_country = ringkasan['bottom_country']
+        min_value = int(ringkasan['bottom_value'])
+        total_affected = int(ringkasan['total'])
+        mean_affected = int(ringkasan['mean'])
+        median_affected = int(ringkasan['median'])
         # Tahun dengan jumlah terdampak terbanyak
-        total_per_year = df_disaster.groupby(year_col)[value_col].sum()
-        max_year = int(total_per_year.idxmax())
-        max_year_value = int(total_per_year.max())
+        max_year = ringkasan['worst_year']
+        max_year_value = int(ringkasan['worst_year_value'])
         st.info(f"""
         **Insight Otomatis:**
         - Negara dengan jumlah orang terdampak bencana terbanyak: **{max_country}** ({max_value:,} orang)
@@ -245,7 +221,7 @@ else:
         st.subheader('Grafik Jumlah Orang Terdampak Bencana per Negara per Tahun')
         # Pilih negara
         negara_pilih = st.selectbox('Pilih Negara', sorted(df_disaster['Country'].unique()))
-        df_negara = df_disaster[df_disaster['Country'] == negara_pilih]
+        df_negara = store.slice(DISASTER_INDICATOR, [negara_pilih])
         fig2 = px.line(
             df_negara,
             x=year_col,
@@ -257,9 +233,10 @@ else:
         )
         st.plotly_chart(fig2, use_container_width=True)
         # Narasi otomatis
-        if not df_negara.empty:
-            max_tahun_negara = df_negara.loc[df_negara[value_col].idxmax(), year_col]
-            max_val_negara = int(df_negara[value_col].max())
+        ringkasan_negara = country_summary(cubes[DISASTER_INDICATOR], [negara_pilih], stat='sum')
+        if not ringkasan_negara.empty:
+            max_tahun_negara = ringkasan_negara['max_year'].iloc[0]
+            max_val_negara = int(ringkasan_negara['max'].iloc[0])
             st.success(f"Tahun paling parah untuk {negara_pilih}: **{max_tahun_negara}** ({max_val_negara:,} orang terdampak)")
 
         # --- KESIMPULAN & NARASI OTOMATIS ---
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+
+from data_loader import CACHE_DIR
+
+# Downloadable exports. A file is only written when someone asks for it, at
+# most once per (dataset version, selection, format): it lands in
+# .cache/exports and every later request, from any session or worker, reads
+# that file back. Rows are written in chunks, so the full export is never
+# held in memory as one string. The directory is kept under a byte budget,
+# least recently downloaded exports (oldest mtime) deleted first, so exports
+# of old data versions and one-off filters age out.
+#
+# DASHBOARD_EXPORT_CACHE_MB=256  disk budget of .cache/exports
+
+EXPORT_DIR = os.path.join(CACHE_DIR, 'exports')
+EXPORT_CACHE_BYTES = int(float(os.environ.get('DASHBOARD_EXPORT_CACHE_MB', 256)) * 2 ** 20)
+CHUNK_ROWS = 50_000
+# Format label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('.csv', 'text/csv'),
+    'CSV (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet')
+}
+
+
+def available_formats():
+    # Parquet needs pyarrow, which is optional
+    if importlib.util.find_spec('pyarrow') is None:
+        return [fmt for fmt in EXPORT_FORMATS if fmt != 'Parquet']
+    return list(EXPORT_FORMATS)
+
+
+def _write_csv(df, out, chunk_rows):
+    # Same bytes as df.to_csv(index=False), one chunk of rows at a time
+    for start in range(0, max(len(df), 1), chunk_rows):
+        out.write(df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode('utf-8'))
+
+
+def _write_parquet(df, out, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        # One row group per chunk
+        for start in range(0, len(df), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False))
+
+
+def write_export(df, fmt, out, chunk_rows=CHUNK_ROWS):
+    # Stream df to the binary file object `out` in the given format
+    if fmt == 'Parquet':
+        _write_parquet(df, out, chunk_rows)
+    elif fmt == 'CSV (gzip)':
+        with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+            _write_csv(df, gz, chunk_rows)
+    else:
+        _write_csv(df, out, chunk_rows)
+
+
+def _prune(keep, max_bytes=EXPORT_CACHE_BYTES):
+    # Delete the least recently used exports until the directory fits the
+    # budget; `keep` (the export being served) is never deleted
+    try:
+        files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in os.scandir(EXPORT_DIR) if not entry.name.endswith('.tmp')]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Open on a platform that can not delete open files
+            continue
+        total -= size
+
+
+def export_bytes(fmt, key, frame):
+    # Contents of the export identified by `key` (the page exporting it,
+    # dataset version and normalized selection); frame() is only called if
+    # it was never written
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(EXPORT_DIR, f'{digest}{EXPORT_FORMATS[fmt][0]}')
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            # Marks it as recently used for _prune
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        with open(tmp_path, 'wb') as out:
+            write_export(frame(), fmt, out)
+        os.replace(tmp_path, path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        # Read-only checkout: build it in memory for this request only
+        out = io.BytesIO()
+        write_export(frame(), fmt, out)
+        return out.getvalue()
+    _prune(path)
+    return data
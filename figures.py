@@ -0,0 +1,223 @@
+import logging
+import re
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+from instrument import note
+from memo import LRUCache
+
+# Figure-building helpers shared by the chart sections. They work on NumPy
+# arrays and plain dicts, which Plotly accepts wherever it takes graph
+# objects.
+
+
+def cumulative_frames(series, frame_keys):
+    # Animation frames that reveal sorted (x, y) series step by step: frame k
+    # holds, for every trace, the prefix with x <= frame_keys[k]. Prefixes
+    # are slices (views) of the arrays given once, the cut points come from
+    # one searchsorted per trace, and each frame only carries x/y plus the
+    # indices of the traces it updates, so styling is not repeated per frame
+    # and Plotly can animate in place with redraw=False.
+    ends = [np.searchsorted(x, frame_keys, side='right') for x, _ in series]
+    traces = list(range(len(series)))
+    return [
+        {
+            'name': str(key),
+            'traces': traces,
+            'data': [{'type': 'scatter', 'x': x[:end[k]], 'y': y[:end[k]]} for (x, y), end in zip(series, ends)]
+        }
+        for k, key in enumerate(frame_keys)
+    ]
+
+
+# Line charts are drawn about this many pixels wide in the wide layout;
+# more points per series than pixels can not be told apart on screen
+CHART_WIDTH = 1200
+# Above this many points a line chart switches to WebGL (Scattergl) traces
+WEBGL_POINT_THRESHOLD = 2000
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: indices of n_out points that keep the
+    # visual shape of a sorted series. Every kept point is an original one,
+    # so hover values stay exact.
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = np.abs((x[prev] - avg_x) * (y[start:stop] - y[prev]) - (x[prev] - x[start:stop]) * (avg_y - y[prev]))
+        prev = start + area.argmax()
+        keep[i + 1] = prev
+    return keep
+
+
+def minmax_buckets(x, y, n_buckets):
+    # Lowest and highest point of each of n_buckets equal-width x buckets,
+    # plus both end points; cheaper than LTTB and keeps every spike
+    n = len(x)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+    span = x[-1] - x[0]
+    buckets = np.minimum(((x - x[0]) / span * n_buckets).astype(np.intp), n_buckets - 1) if span else np.zeros(n, dtype=np.intp)
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    first = np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]]
+    last = np.r_[sorted_buckets[1:] != sorted_buckets[:-1], True]
+    return np.unique(np.r_[0, order[first], order[last], n - 1])
+
+
+def decimate(df, x_col, y_col, group_col, points=CHART_WIDTH, method='lttb'):
+    # Thin every series of a long frame to about `points` rows for drawing.
+    # Series already that short, and rows with a missing value (the gaps in
+    # a line), are kept as they are. Narrowing the x range (e.g. the year
+    # slider) re-runs this on fewer rows, so zooming in shows exact data.
+    xs = df[x_col].to_numpy(dtype=np.float64)
+    ys = df[y_col].to_numpy(dtype=np.float64)
+    keep = []
+    thinned = False
+    for positions in df.groupby(group_col, observed=True, sort=False).indices.values():
+        if len(positions) <= points:
+            keep.append(positions)
+            continue
+        thinned = True
+        positions = positions[np.argsort(xs[positions], kind='stable')]
+        x, y = xs[positions], ys[positions]
+        valid = ~np.isnan(y)
+        if method == 'lttb':
+            picked = lttb(x[valid], y[valid], points)
+        else:
+            picked = minmax_buckets(x[valid], y[valid], points // 2)
+        keep.append(np.concatenate([positions[valid][picked], positions[~valid]]))
+    if not thinned:
+        return df
+    return df.take(np.sort(np.concatenate(keep)))
+
+
+def render_mode(df):
+    # px render_mode for a line chart of this many points
+    return 'webgl' if len(df) > WEBGL_POINT_THRESHOLD else 'svg'
+
+
+# Serialized size above which a chart is logged as over budget
+PAYLOAD_BUDGET = 200_000
+_CUSTOMDATA_REF = re.compile(r'%\{customdata\[(\d+)\]([^}]*)\}')
+
+
+def _typed(values):
+    # Numeric sequences as NumPy arrays, which Plotly sends as base64 `bdata`
+    if isinstance(values, (list, tuple)):
+        array = np.asarray(values)
+        if array.dtype.kind in 'iuf':
+            return array
+    return values
+
+
+def _compact_trace(trace):
+    for attr in ('x', 'y'):
+        if attr in trace and trace[attr] is not None:
+            trace[attr] = _typed(trace[attr])
+    customdata = trace['customdata'] if 'customdata' in trace else None
+    hovertemplate = trace['hovertemplate'] if 'hovertemplate' in trace else None
+    if customdata is None or not hovertemplate:
+        return
+    customdata = np.asarray(customdata)
+    if customdata.ndim != 2 or not len(customdata):
+        return
+    # Columns holding one value for the whole trace (px puts e.g. the colour
+    # column there) are written into the hover template once instead of
+    # being shipped per point
+    constant = {
+        j for j in range(customdata.shape[1])
+        if (customdata[:, j] == customdata[0, j]).all() and f'%{{customdata[{j}]}}' in hovertemplate
+    }
+    if not constant:
+        return
+    kept = [j for j in range(customdata.shape[1]) if j not in constant]
+    renumber = {old: new for new, old in enumerate(kept)}
+
+    def rewrite(match):
+        j = int(match.group(1))
+        if j in constant and not match.group(2):
+            return str(customdata[0, j])
+        return f'%{{customdata[{renumber[j]}]{match.group(2)}}}'
+    trace['hovertemplate'] = _CUSTOMDATA_REF.sub(rewrite, hovertemplate)
+    trace['customdata'] = _typed(customdata[:, kept].tolist()) if kept else None
+
+
+def compact_figure(fig):
+    # Smaller spec for st.plotly_chart: typed arrays for numeric data,
+    # per-trace constant customdata folded into the hover template, and
+    # the template trimmed to the trace types the figure actually uses
+    for trace in fig.data:
+        _compact_trace(trace)
+    for frame in fig.frames:
+        for trace in frame.data:
+            _compact_trace(trace)
+    template = fig.layout.template
+    if template is not None:
+        used = {trace.type for trace in fig.data}
+        fig.layout.template = go.layout.Template(
+            layout=template.layout,
+            data={kind: getattr(template.data, kind) for kind in used if getattr(template.data, kind, None)}
+        )
+    return fig
+
+
+# Memory budget of the figure cache, measured as serialized figure size
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@st.cache_resource(show_spinner=False)
+def payload_log():
+    # Last serialized size per chart name, shared by every session
+    return {'sizes': {}, 'lock': threading.Lock()}
+
+
+def payload_report():
+    # (chart name, bytes) pairs, largest first
+    log = payload_log()
+    with log['lock']:
+        return sorted(log['sizes'].items(), key=lambda item: -item[1])
+
+
+@st.cache_resource(show_spinner=False)
+def figure_cache():
+    # Built and compacted figures with their serialized size, shared by all
+    # sessions. Figures are treated as read-only once cached.
+    return LRUCache(max_entries=512, max_bytes=FIGURE_CACHE_BYTES, sizeof=lambda entry: entry[1])
+
+
+def _prepare(fig):
+    compact_figure(fig)
+    return fig, len(pio.to_json(fig, validate=False))
+
+
+def _show(fig, size, name, **kwargs):
+    log = payload_log()
+    with log['lock']:
+        log['sizes'][name] = size
+    note(payload_bytes=size)
+    if size > PAYLOAD_BUDGET:
+        logging.getLogger(__name__).warning('Chart %s payload is %d bytes (budget %d)', name, size, PAYLOAD_BUDGET)
+    return st.plotly_chart(fig, **kwargs)
+
+
+def cached_plotly_chart(name, state_key, build, **kwargs):
+    # st.plotly_chart for the compacted figure returned by build(), which
+    # only runs when no session has drawn this chart for `state_key` yet. It
+    # must cover everything build() reads: the normalized widget state and
+    # the dataset version. The payload size is recorded under `name` and
+    # charts over PAYLOAD_BUDGET are logged.
+    fig, size = figure_cache().get_or_compute((name, state_key), lambda: _prepare(build()))
+    return _show(fig, size, name, **kwargs)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Two-sided 95% quantile of the normal distribution, used for the
+# prediction intervals (scipy is not a dependency)
+Z_95 = 1.96
+
+
+class TrendModel:
+    # Linear trend (value = intercept + slope * year) for every country of a
+    # data_store.Cube, fitted in one batched closed-form least-squares pass.
+    # The per-cell moments are stored as running sums along the year axis,
+    # so the fit over any year range is the difference of two prefix columns
+    # and a request never refits anything.
+
+    def __init__(self, cube, stat='mean'):
+        self.cube = cube
+        values = cube.planes[stat]
+        valid = ~np.isnan(values)
+        # Years are offset from the first cube year to keep the sums well conditioned
+        x = np.broadcast_to(np.arange(len(cube.years), dtype=np.float64), values.shape)
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, values, 0.0)
+        moments = np.stack([valid.astype(np.float64), x, y, x * x, x * y, y * y])
+        self._valid = valid
+        self._prefix = np.concatenate([np.zeros(moments.shape[:2] + (1,)), moments.cumsum(axis=2)], axis=2)
+
+    def fit(self, countries=None, year_range=None):
+        # Coefficients per selected country with at least two observations:
+        # n, slope, intercept, resid_std (NaN below three points), last_year
+        cube = self.cube
+        rows, cols = cube._rows(countries), cube._cols(year_range)
+        n, sx, sy, sxx, sxy, syy = self._prefix[:, rows, cols.stop] - self._prefix[:, rows, cols.start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_mean = sx / n
+            y_mean = sy / n
+            ss_xx = sxx - n * x_mean ** 2
+            ss_xy = sxy - n * x_mean * y_mean
+            ss_yy = syy - n * y_mean ** 2
+            slope = ss_xy / ss_xx
+            resid_ss = np.maximum(ss_yy - slope * ss_xy, 0.0)
+            resid_std = np.where(n > 2, np.sqrt(resid_ss / (n - 2)), np.nan)
+        valid = self._valid[rows, cols]
+        last_pos = valid.shape[1] - 1 - valid[:, ::-1].argmax(axis=1) if valid.shape[1] else np.zeros(len(rows), dtype=np.intp)
+        first_year = cube.years[0] if len(cube.years) else 0
+        fits = pd.DataFrame({
+            'n': n.astype(np.int64),
+            'slope': slope,
+            'intercept': y_mean - slope * (x_mean + first_year),
+            'resid_std': resid_std,
+            'x_mean': x_mean + first_year,
+            'ss_xx': ss_xx,
+            'last_year': cube.years[cols][last_pos] if valid.shape[1] else np.zeros(len(rows), dtype=np.int64)
+        }, index=pd.Index(cube.countries[rows], name='Country'))
+        return fits[(fits['n'] >= 2) & (fits['ss_xx'] > 0)]
+
+    def predict(self, countries=None, year_range=None, horizon=3, min_points=2):
+        # Long Country/Year/Prediction/Lower/Upper rows for the `horizon`
+        # years after each country's last observed year in the selection
+        fits = self.fit(countries, year_range)
+        fits = fits[fits['n'] >= min_points]
+        steps = np.arange(1, horizon + 1)
+        years = fits['last_year'].to_numpy()[:, None] + steps
+        pred = fits['intercept'].to_numpy()[:, None] + fits['slope'].to_numpy()[:, None] * years
+        n = fits['n'].to_numpy()[:, None]
+        spread = np.sqrt(1 + 1 / n + (years - fits['x_mean'].to_numpy()[:, None]) ** 2 / fits['ss_xx'].to_numpy()[:, None])
+        margin = Z_95 * fits['resid_std'].to_numpy()[:, None] * spread
+        return pd.DataFrame({
+            'Country': np.repeat(fits.index.to_numpy(), horizon),
+            'Year': years.ravel(),
+            'Prediction': pred.ravel(),
+            'Lower': (pred - margin).ravel(),
+            'Upper': (pred + margin).ravel()
+        })
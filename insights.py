@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# Automatic insight numbers, computed in single vectorized passes over the
+# country x year planes of a data_store.Cube. Every function returns plain
+# data (a DataFrame or a dict) and leaves the wording to the scripts.
+
+
+def country_summary(cube, countries=None, year_range=None, stat='mean'):
+    # One row per selected country with data:
+    #   first_year/first, last_year/last, delta - `stat` plane at the first and last year with rows
+    #   min/min_year, max/max_year             - extremes of the raw values
+    #   total, count, mean                      - over the raw values in the selection
+    countries_sel, years_sel, values = cube.select(stat, countries, year_range)
+    _, _, low = cube.select('min', countries, year_range)
+    _, _, high = cube.select('max', countries, year_range)
+    _, _, total = cube.select('sum', countries, year_range)
+    _, _, count = cube.select('count', countries, year_range)
+    _, _, present = cube.select('rows', countries, year_range)
+    count = count.sum(axis=1)
+    has_data = count > 0
+    if not has_data.any() or not len(years_sel):
+        return pd.DataFrame(columns=['first_year', 'first', 'last_year', 'last', 'delta', 'min', 'min_year', 'max', 'max_year', 'total', 'count', 'mean'], index=pd.Index([], name='Country'))
+
+    rows = np.arange(len(countries_sel))
+    valid = present > 0
+    first_pos = valid.argmax(axis=1)
+    last_pos = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    # argmax/argmin return the earliest year on ties, like idxmax on year-sorted rows
+    max_pos = np.where(np.isnan(high), -np.inf, high).argmax(axis=1)
+    min_pos = np.where(np.isnan(low), np.inf, low).argmin(axis=1)
+    totals = total.sum(axis=1)
+    summary = pd.DataFrame({
+        'first_year': years_sel[first_pos],
+        'first': values[rows, first_pos],
+        'last_year': years_sel[last_pos],
+        'last': values[rows, last_pos],
+        'min': low[rows, min_pos],
+        'min_year': years_sel[min_pos],
+        'max': high[rows, max_pos],
+        'max_year': years_sel[max_pos],
+        'total': totals,
+        'count': count,
+    }, index=pd.Index(countries_sel, name='Country'))
+    summary.insert(4, 'delta', summary['last'] - summary['first'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        summary['mean'] = totals / count
+    return summary[has_data]
+
+
+def regional_summary(cube):
+    # Region-wide totals of one indicator: ranked countries, worst year,
+    # overall total/mean/median
+    by_country = cube.by_country('sum').sort_values(ascending=False)
+    by_year = cube.by_year('sum')
+    return {
+        'by_country': by_country,
+        'by_year': by_year,
+        'top_country': by_country.idxmax(),
+        'top_value': by_country.max(),
+        'bottom_country': by_country.idxmin(),
+        'bottom_value': by_country.min(),
+        'worst_year': int(by_year.idxmax()),
+        'worst_year_value': by_year.max(),
+        'total': cube.total('sum'),
+        'mean': cube.total('mean'),
+        'median': cube.total('median')
+    }
@@ -0,0 +1,145 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Per-section timings of a rerun. Every page section runs inside
+# section(name), which records its wall time, and code inside it reports
+# what it did with note(): rows processed, cache hits/misses (LRUCache does
+# this itself) and serialized chart bytes (figures does). The records of
+# the current rerun are kept per thread, which Streamlit gives each session;
+# totals per section are kept per process and can be written as a
+# Prometheus text file. A section costs two perf_counter calls and a few
+# dict updates, so this stays on in production.
+#
+# DASHBOARD_METRICS_FILE=path  write the totals there (node_exporter
+#                              textfile collector format) at most every
+#                              METRICS_INTERVAL seconds
+# logging at DEBUG for this module  one JSON line per section run
+
+METRICS_FILE = os.environ.get('DASHBOARD_METRICS_FILE')
+METRICS_INTERVAL = 10.0
+COUNTERS = ('rows', 'cache_hits', 'cache_misses', 'payload_bytes')
+
+_local = threading.local()
+_log = logging.getLogger(__name__)
+
+
+@st.cache_resource(show_spinner=False)
+def section_metrics():
+    # Totals per section name, shared by every session of the process
+    return {'sections': {}, 'lock': threading.Lock(), 'written': 0.0}
+
+
+def begin_run():
+    # Start of a script run: forget the previous rerun's records
+    _local.records = []
+    _local.stack = []
+
+
+def run_records():
+    # Records of the sections finished so far in this rerun, in order
+    return list(getattr(_local, 'records', []))
+
+
+def note(**counts):
+    # Add counts (see COUNTERS) to the innermost running section, if any
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        record = stack[-1]
+        for name, value in counts.items():
+            record[name] += value
+
+
+@contextmanager
+def section(name):
+    if not hasattr(_local, 'stack'):
+        begin_run()
+    record = dict.fromkeys(COUNTERS, 0)
+    record.update(section=name, seconds=0.0, error=False)
+    _local.stack.append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record['error'] = True
+        raise
+    finally:
+        record['seconds'] = time.perf_counter() - started
+        _local.stack.pop()
+        _local.records.append(record)
+        _add_totals(record)
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug(json.dumps(record))
+
+
+def timed(name):
+    # Decorator form of section()
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _add_totals(record):
+    metrics = section_metrics()
+    with metrics['lock']:
+        totals = metrics['sections'].setdefault(record['section'], dict.fromkeys(COUNTERS + ('runs', 'errors', 'seconds'), 0))
+        totals['runs'] += 1
+        totals['errors'] += record['error']
+        totals['seconds'] += record['seconds']
+        for name in COUNTERS:
+            totals[name] += record[name]
+
+
+def prometheus_text():
+    # Totals in the Prometheus text exposition format
+    metrics = section_metrics()
+    with metrics['lock']:
+        sections = {name: dict(totals) for name, totals in metrics['sections'].items()}
+    families = [
+        ('dashboard_section_duration_seconds', 'summary', 'Wall time of page sections.', None),
+        ('dashboard_section_errors_total', 'counter', 'Section runs that raised.', 'errors'),
+        ('dashboard_section_rows_total', 'counter', 'Rows processed by page sections.', 'rows'),
+        ('dashboard_section_cache_hits_total', 'counter', 'Figure/filter cache hits in page sections.', 'cache_hits'),
+        ('dashboard_section_cache_misses_total', 'counter', 'Figure/filter cache misses in page sections.', 'cache_misses'),
+        ('dashboard_section_payload_bytes_total', 'counter', 'Serialized chart bytes sent by page sections.', 'payload_bytes'),
+    ]
+    lines = []
+    for family, kind, help_text, field in families:
+        lines += [f'# HELP {family} {help_text}', f'# TYPE {family} {kind}']
+        for name, totals in sorted(sections.items()):
+            label = '{section="%s"}' % name.replace('\\', '\\\\').replace('"', '\\"')
+            if field is None:
+                lines += [f"{family}_sum{label} {totals['seconds']:.6f}", f"{family}_count{label} {totals['runs']}"]
+            else:
+                lines.append(f'{family}{label} {totals[field]}')
+    return '\n'.join(lines) + '\n'
+
+
+def export_metrics(path=METRICS_FILE, interval=METRICS_INTERVAL):
+    # Rewrite the Prometheus text file if one is configured and the last
+    # write is older than `interval` seconds
+    if not path:
+        return
+    metrics = section_metrics()
+    now = time.monotonic()
+    with metrics['lock']:
+        if now - metrics['written'] < interval:
+            return
+        metrics['written'] = now
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        _log.warning('Could not write metrics to %s: %s', path, e)
@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from instrument import note
+
+
+class LRUCache:
+    # Thread-safe LRU map with hit/miss counters. Streamlit runs every
+    # session in its own thread, so one instance can be shared by all of them.
+    # With `max_bytes`, entries are also evicted once the sum of
+    # sizeof(value) goes over that budget; on_evict(key, value) is called
+    # for every evicted entry.
+
+    def __init__(self, max_entries=256, max_bytes=None, sizeof=None, on_evict=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._sizes = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            hit = key in self._entries
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = self._entries[key]
+            else:
+                self.misses += 1
+                value = default
+        # Also counted for the page section doing the lookup
+        note(cache_hits=int(hit), cache_misses=int(not hit))
+        return value
+
+    def put(self, key, value):
+        size = self._sizeof(value) if self._sizeof else 0
+        evicted = []
+        with self._lock:
+            self.bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes and len(self._entries) > 1):
+                evicted.append(self._entries.popitem(last=False))
+                self.bytes -= self._sizes.pop(evicted[-1][0])
+        if self._on_evict:
+            for evicted_key, evicted_value in evicted:
+                self._on_evict(evicted_key, evicted_value)
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            # Computed outside the lock so a slow miss does not block other sessions
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def filter_cache():
+    # One cache per process for the "filter -> aggregate" step of every chart
+    return LRUCache(max_entries=256)
+
+
+def selection_key(countries, year_range):
+    # Normalized widget state: the order countries were picked in does not
+    # matter, and numpy/int years compare equal
+    return frozenset(countries), tuple(int(year) for year in year_range)
+
+
+def memoize_filter(chart_id, version, countries, year_range, compute):
+    # A rerun triggered by another widget is a lookup
+    key = (version, chart_id) + selection_key(countries, year_range)
+    return filter_cache().get_or_compute(key, compute)
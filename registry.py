@@ -0,0 +1,123 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Process-wide home of the loaded tables. Every frame a loader builds is
+# registered here once, its NumPy buffers are made read-only, and sessions
+# only ever get views of it (df.copy(deep=False), which shares the buffers
+# and, with Copy-on-Write, copies a column only if a session writes to it).
+# The same buffers are used to tell, for the objects a session holds, which
+# bytes are views of shared data and which are the session's own.
+
+
+def _column_arrays(series):
+    # The NumPy buffers behind one column, or None if it is not NumPy backed
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return [series.array.codes]
+    if isinstance(series.dtype, np.dtype):
+        return [series.to_numpy(copy=False)]
+    return None
+
+
+def _root(array):
+    # The array that owns (or maps) the memory `array` is a view of
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def _arrays(obj, seen):
+    # (array, nbytes) of every buffer reachable from obj, each counted once;
+    # columns that are not NumPy backed are reported as (None, nbytes)
+    if isinstance(obj, np.ndarray):
+        key = (obj.__array_interface__['data'][0], obj.nbytes)
+        if key not in seen:
+            seen.add(key)
+            yield obj, obj.nbytes
+        return
+    if isinstance(obj, pd.Series):
+        arrays = _column_arrays(obj)
+        if arrays is None:
+            yield None, int(obj.memory_usage(index=False, deep=True))
+        for array in arrays or []:
+            yield from _arrays(array, seen)
+        return
+    # Containers are held by the caller for the whole walk, so their ids
+    # are stable (unlike the temporary Series of a frame's columns)
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        for _, series in obj.items():
+            yield from _arrays(series, seen)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _arrays(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield from _arrays(value, seen)
+
+
+def nbytes(obj):
+    # Bytes of the buffers reachable from obj, each counted once
+    return sum(size for _, size in _arrays(obj, set()))
+
+
+class DatasetRegistry:
+
+    def __init__(self):
+        self._frames = {}
+        self._roots = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, df):
+        # Register df under name (replacing an older version) and freeze it
+        roots = []
+        for array, _ in _arrays(df, set()):
+            if array is not None:
+                root = _root(array)
+                root.flags.writeable = False
+                roots.append(root)
+        with self._lock:
+            self._frames[name] = df
+            self._roots[name] = roots
+        return df
+
+    def remove(self, name, df=None):
+        # Forget name (if it is still df, when given), e.g. when its loader
+        # evicts it; views sessions already hold stay valid
+        with self._lock:
+            if name in self._frames and (df is None or self._frames[name] is df):
+                del self._frames[name]
+                del self._roots[name]
+
+    def report(self):
+        # {name: (rows, bytes)} of every registered frame
+        with self._lock:
+            frames = dict(self._frames)
+        return {name: (len(df), nbytes(df)) for name, df in frames.items()}
+
+    def usage(self, objects):
+        # Bytes reachable from objects, split into views of registered
+        # buffers ('shared') and memory owned by the caller ('private')
+        with self._lock:
+            roots = [root for arrays in self._roots.values() for root in arrays]
+        shared = private = 0
+        for array, size in _arrays(objects, set()):
+            if array is not None and any(np.may_share_memory(array, root) for root in roots):
+                shared += size
+            else:
+                private += size
+        return {'shared': shared, 'private': private}
+
+
+@st.cache_resource(show_spinner=False)
+def dataset_registry():
+    return DatasetRegistry()
+
+
+def view(df):
+    # A session's handle on a registered frame: new column index, same buffers
+    return df.copy(deep=False)
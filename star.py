@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Star schema of an SDMX CSV export (the SPC .Stat download format). Every
+# row of such a file repeats ~20 code/label string pairs; here each group of
+# pairs becomes a small dimension table and the rows become an integer fact
+# table:
+#   facts       indicator_id, country_id, breakdown_id, annotation_id (int16,
+#               or int32 for a dimension of more than 32,767 rows), year (int16), value
+#   indicator   INDICATOR/Indicator, UNIT_MEASURE/Unit of measure
+#   country     GEO_PICT/Pacific Island Countries and territories
+#   breakdown   SEX, AGE, URBANIZATION, INCOME, EDUCATION, OCCUPATION,
+#               COMPOSITE_BREAKDOWN, DISABILITY (+ labels), plus `label`
+#               and `is_total`
+#   annotation  REPORTING_TYPE, NATURE, OBS_STATUS, DATA_SOURCE, OBS_COMMENT (+ labels)
+#   dataflow    one row: STRUCTURE_ID, STRUCTURE_NAME, FREQ, Frequency
+# Ids are row numbers of the dimension tables, so they are only meaningful
+# within one StarSchema; countries.country_ids() maps the country table to
+# the process-wide country ids. Labels are looked up only when shown.
+
+# Dimension -> (code column, label column) pairs; columns a dataflow does
+# not have are skipped
+DIMENSIONS = {
+    'indicator': [('INDICATOR', 'Indicator'), ('UNIT_MEASURE', 'Unit of measure')],
+    'country': [('GEO_PICT', 'Pacific Island Countries and territories')],
+    'breakdown': [
+        ('SEX', 'Sex'), ('AGE', 'Age'), ('URBANIZATION', 'Urbanization'), ('INCOME', 'Income'),
+        ('EDUCATION', 'Education level'), ('OCCUPATION', 'Occupation'),
+        ('COMPOSITE_BREAKDOWN', 'Composite breakdown'), ('DISABILITY', 'Disability')
+    ],
+    'annotation': [
+        ('REPORTING_TYPE', 'Reporting type'), ('NATURE', 'Nature'), ('OBS_STATUS', 'Observation Status'),
+        ('DATA_SOURCE', 'Data source'), ('OBS_COMMENT', 'Comment')
+    ],
+}
+DATAFLOW_COLUMNS = ['STRUCTURE_ID', 'STRUCTURE_NAME', 'FREQ', 'Frequency']
+# Label of the breakdown rows that have no breakdown (is_total)
+TOTAL_BREAKDOWN = 'Total'
+YEAR_COLUMN = 'TIME_PERIOD'
+VALUE_COLUMN = 'OBS_VALUE'
+
+
+def source_columns(header):
+    # The columns of a file with this header that the star schema reads
+    wanted = [col for pairs in DIMENSIONS.values() for pair in pairs for col in pair] + DATAFLOW_COLUMNS + [YEAR_COLUMN, VALUE_COLUMN]
+    return [col for col in wanted if col in header]
+
+
+def is_total(code):
+    # SDMX codes for "no breakdown": total, not applicable, or an explicit
+    # "all" member such as TRE_ALL
+    return pd.isna(code) or code in ('_T', '_Z') or str(code).endswith('_ALL')
+
+
+def _clean(value):
+    # The export wraps long labels ('... (watts per\n            capita)')
+    return ' '.join(value.split()) if isinstance(value, str) else value
+
+
+def _row_keys(df, columns):
+    # One dense int64 key per distinct combination of the columns, folded
+    # in column by column from their integer codes (-1 where missing)
+    keys = np.zeros(len(df), dtype=np.int64)
+    for column in columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, width = series.cat.codes.to_numpy(), len(series.cat.categories) + 1
+        else:
+            codes = pd.factorize(series)[0]
+            width = codes.max(initial=-1) + 2
+        keys = pd.factorize(keys * width + codes + 1)[0]
+    return keys
+
+
+def _id_dtype(n_rows):
+    # Smallest integer type that numbers n_rows dimension rows
+    for dtype in (np.int16, np.int32):
+        if n_rows <= np.iinfo(dtype).max + 1:
+            return dtype
+    raise ValueError(f'{n_rows:,} dimension rows do not fit in int32 ids')
+
+
+def _dimension(df, pairs):
+    # (ids per row, dimension table) for the distinct combinations of the
+    # code columns, numbered in sorted code order
+    # A label column stands in for a missing code column
+    codes = [code if code in df.columns else label for code, label in pairs if code in df.columns or label in df.columns]
+    labels = [label for _, label in pairs if label in df.columns and df[label].notna().any()]
+    if not codes:
+        return np.zeros(len(df), dtype=np.int16), pd.DataFrame(index=pd.RangeIndex(1))
+    columns = codes + [label for label in labels if label not in codes]
+    # Distinct rows by their integer codes, then strip and sort only those;
+    # stripping may merge some of them
+    _, first, raw_ids = np.unique(_row_keys(df, codes), return_index=True, return_inverse=True)
+    distinct = df[columns].iloc[first].astype(object).map(_clean).reset_index(drop=True)
+    sorted_ids = distinct.groupby(codes, dropna=False, sort=True).ngroup().to_numpy()
+    _, keep = np.unique(sorted_ids, return_index=True)
+    return sorted_ids[raw_ids].astype(_id_dtype(len(keep))), distinct.iloc[keep].reset_index(drop=True)
+
+
+def _members(breakdown):
+    # Per breakdown row: (code, label column, label) of each member it has
+    pairs = [(code, label if label in breakdown.columns else code) for code, label in DIMENSIONS['breakdown'] if code in breakdown.columns]
+    for _, row in breakdown.iterrows():
+        yield [(row[code], column, row[column]) for code, column in pairs]
+
+
+def _member_label(column, text):
+    # 'Urbanization: Rural'; labels that already name their dimension
+    # ('Type of renewable energy: Solar') are kept as they are
+    return str(text) if ':' in str(text) else f'{column}: {text}'
+
+
+class StarSchema:
+    TABLES = ('facts', 'indicator', 'country', 'breakdown', 'annotation', 'dataflow')
+
+    def __init__(self, facts, dimensions, dataflow):
+        self.facts = facts
+        self.dimensions = dimensions
+        self.dataflow = dataflow
+
+    @classmethod
+    def from_sdmx(cls, df):
+        # Split a frame of SDMX CSV columns (see source_columns)
+        df = df[df[YEAR_COLUMN].notna()].reset_index(drop=True)
+        facts = {}
+        dimensions = {}
+        for name, pairs in DIMENSIONS.items():
+            facts[f'{name}_id'], dimensions[name] = _dimension(df, pairs)
+        breakdown = dimensions['breakdown']
+        breakdown['is_total'] = [all(is_total(code) for code, _, _ in members) for members in _members(breakdown)]
+        breakdown['label'] = [
+            ', '.join(_member_label(column, text) for code, column, text in members if not is_total(code)) or TOTAL_BREAKDOWN
+            for members in _members(breakdown)
+        ]
+        facts['year'] = df[YEAR_COLUMN].to_numpy(dtype=np.int16)
+        facts['value'] = df[VALUE_COLUMN].to_numpy(dtype=np.float64)
+        dataflow = df[[col for col in DATAFLOW_COLUMNS if col in df.columns]].head(1).astype(object).reset_index(drop=True)
+        return cls(pd.DataFrame(facts), dimensions, dataflow)
+
+    def tables(self):
+        # Every table as a plain frame (e.g. to write to the columnar cache)
+        return {'facts': self.facts, **self.dimensions, 'dataflow': self.dataflow}
+
+    @classmethod
+    def from_tables(cls, tables):
+        dimensions = {name: tables[name] for name in DIMENSIONS}
+        return cls(tables['facts'], dimensions, tables['dataflow'])
+
+    def __len__(self):
+        return len(self.facts)
+
+    def labels(self, dimension, column, ids=None):
+        # Values of one dimension column, for `ids` (all rows if None)
+        values = self.dimensions[dimension][column].to_numpy()
+        return values if ids is None else values[ids]
+
+    def categorical(self, dimension, column):
+        # The column as a Categorical over the fact rows with sorted
+        # categories, built from the integer ids without per-row strings
+        categories, codes = np.unique(self.labels(dimension, column).astype(str), return_inverse=True)
+        return pd.Categorical.from_codes(codes[self.facts[f'{dimension}_id'].to_numpy()], categories)
+
+    def to_frame(self):
+        # Indicator/Breakdown/Country/Country Code/Year/Value rows, the long
+        # table the dashboard works on
+        return pd.DataFrame({
+            'Indicator': self.categorical('indicator', 'Indicator'),
+            'Breakdown': self.categorical('breakdown', 'label'),
+            'Country': self.categorical('country', 'Pacific Island Countries and territories'),
+            'Country Code': self.categorical('country', 'GEO_PICT'),
+            'Year': self.facts['year'].to_numpy(),
+            'Value': self.facts['value'].to_numpy()
+        })
@@ -0,0 +1,70 @@
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+# Cold-start import profile of the app, built on `python -X importtime`.
+# Run it after changing imports to catch startup regressions:
+#   python startup_report.py                  # profile app_gabungan
+#   python startup_report.py data_loader      # profile other modules
+#   python startup_report.py --json report.json
+
+
+def profile_imports(modules):
+    # Import the modules in a fresh interpreter and parse the importtime log:
+    # one (module, self_us, cumulative_us, depth) entry per import
+    code = '; '.join(f'import {module}' for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append({
+            'module': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2
+        })
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return entries
+
+
+def summarize(entries, top=15):
+    # Totals per top-level package (self time, so nothing is counted twice)
+    # and the slowest individual imports
+    packages = defaultdict(int)
+    for entry in entries:
+        packages[entry['module'].split('.')[0]] += entry['self_us']
+    return {
+        'total_us': sum(entry['self_us'] for entry in entries),
+        'modules': len(entries),
+        'packages': dict(sorted(packages.items(), key=lambda item: -item[1])[:top]),
+        'slowest': sorted(entries, key=lambda entry: -entry['self_us'])[:top]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time breakdown of the app cold start.')
+    parser.add_argument('modules', nargs='*', default=['app_gabungan'])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', metavar='PATH', help='also write the report as JSON')
+    args = parser.parse_args()
+
+    report = summarize(profile_imports(args.modules), args.top)
+    print(f"{' '.join(args.modules)}: {report['total_us'] / 1e3:.0f} ms over {report['modules']} imports")
+    print('\nBy package (self time):')
+    for package, self_us in report['packages'].items():
+        print(f'  {self_us / 1e3:9.1f} ms  {package}')
+    print('\nSlowest imports (self time):')
+    for entry in report['slowest']:
+        print(f"  {entry['self_us'] / 1e3:9.1f} ms  {entry['module']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(report, target=args.modules), f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from countries import country_ids
+from data_loader import BASE_DIR, _read_cache, _write_cache, file_fingerprint, normalize_worldbank
+from registry import dataset_registry
+
+# Bulk ingest of World Bank indicator downloads. Every API_*.csv in a
+# directory (and in the folders its zips extract into) is parsed and melted
+# in a process pool, one file per task, and the results are stacked into
+# one long table:
+#   values      indicator (category of codes), country_id (int32), year (int16), value
+#   indicators  Indicator Code, Indicator Name, Source Note, Source Organization
+#   countries   country_id, Country Code, Country, Region, Income Group
+# Country ids are those of countries.py, so the table joins with the SPC
+# data directly. Region and income group come from the Metadata_Country_*
+# files of the downloads (missing for aggregates such as 'World'), the
+# indicator notes from Metadata_Indicator_*; without them those columns
+# are empty. Only observed values are kept: most cells of the wide files
+# are blank.
+#
+# The process pool is only used offline: `python worldbank.py DIR
+# [--workers N]` builds the tables and writes them to the columnar cache
+# (.cache/worldbank.*). The app's load_worldbank() reads that cache; when
+# it is missing or stale it parses the files one by one in the server
+# process, never in a pool, which would fork the Streamlit server.
+
+TABLES = ('values', 'indicators', 'countries')
+INDICATOR_COLUMNS = ['Indicator Code', 'Indicator Name', 'Source Note', 'Source Organization']
+COUNTRY_COLUMNS = ['country_id', 'Country Code', 'Country', 'Region', 'Income Group']
+
+
+def _glob(directory, pattern):
+    paths = glob.glob(os.path.join(directory, pattern)) + glob.glob(os.path.join(directory, '*', pattern))
+    return sorted(os.path.abspath(path) for path in paths)
+
+
+def discover_api_files(directory=BASE_DIR):
+    return _glob(directory, 'API_*.csv')
+
+
+def _source_paths(directory):
+    # Every file build_worldbank reads
+    return discover_api_files(directory) + _glob(directory, 'Metadata_Indicator_API_*.csv') + _glob(directory, 'Metadata_Country_API_*.csv')
+
+
+def _read_api_file(path):
+    # Worker task: (indicator code, indicator name, observed long rows) of one file
+    header = pd.read_csv(path, skiprows=4, usecols=['Indicator Code', 'Indicator Name'], nrows=1)
+    df = normalize_worldbank(path).dropna(subset=['Value'])
+    return str(header['Indicator Code'].iloc[0]), str(header['Indicator Name'].iloc[0]), df
+
+
+def read_api_files(paths, workers=None):
+    # _read_api_file of every path, in file order, on up to `workers`
+    # processes (default: one per core)
+    workers = min(len(paths), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [_read_api_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_read_api_file, paths))
+
+
+def _read_metadata(paths, columns, key):
+    # The Metadata_* files of all downloads, one row per key
+    frames = [pd.read_csv(path, usecols=lambda col: col in columns, dtype=str) for path in paths]
+    frames = [frame for frame in frames if key in frame.columns]
+    if not frames:
+        return pd.DataFrame(columns=list(columns.values()))
+    df = pd.concat(frames, ignore_index=True).rename(columns=columns)
+    return df.drop_duplicates(subset=[columns[key]])
+
+
+class WorldBankTables:
+
+    def __init__(self, values, indicators, countries):
+        self.values = values
+        self.indicators = indicators
+        self.countries = countries
+
+    def __len__(self):
+        return len(self.values)
+
+    def to_frame(self, indicators=None):
+        # Labelled Indicator/Country/Country Code/Region/Year/Value rows of
+        # some indicator codes (all if None), for display
+        values = self.values if indicators is None else self.values[self.values['indicator'].isin(indicators)]
+        names = dict(zip(self.indicators['Indicator Code'], self.indicators['Indicator Name']))
+        countries = self.countries.set_index('country_id').reindex(values['country_id'].to_numpy())
+        return pd.DataFrame({
+            'Indicator': values['indicator'].map(names).to_numpy(),
+            'Country': countries['Country'].to_numpy(),
+            'Country Code': countries['Country Code'].to_numpy(),
+            'Region': countries['Region'].to_numpy(),
+            'Year': values['year'].to_numpy(),
+            'Value': values['value'].to_numpy()
+        })
+
+
+def build_worldbank(directory=BASE_DIR, workers=None):
+    names = {}
+    values = [pd.DataFrame({'indicator': [], 'country_id': np.empty(0, dtype=np.int32), 'year': np.empty(0, dtype=np.int16), 'value': []})]
+    countries = [pd.DataFrame(columns=['country_id', 'Country Code', 'Country'])]
+    for code, name, df in read_api_files(discover_api_files(directory), workers):
+        # Country ids are resolved here: the index is per process
+        ids = country_ids(df)
+        names.setdefault(code, name)
+        values.append(pd.DataFrame({'indicator': code, 'country_id': ids, 'year': df['Year'].to_numpy(), 'value': df['Value'].to_numpy()}))
+        countries.append(pd.DataFrame({'country_id': ids, 'Country Code': df['Country Code'].astype(str), 'Country': df['Country'].astype(str)}))
+    codes = sorted(names)
+    values = pd.concat(values, ignore_index=True).astype({
+        'indicator': pd.CategoricalDtype(codes), 'country_id': 'int32', 'year': 'int16', 'value': 'float64'
+    })
+
+    indicator_meta = _read_metadata(
+        _glob(directory, 'Metadata_Indicator_API_*.csv'),
+        {'INDICATOR_CODE': 'Indicator Code', 'SOURCE_NOTE': 'Source Note', 'SOURCE_ORGANIZATION': 'Source Organization'},
+        'INDICATOR_CODE'
+    )
+    indicators = pd.DataFrame({'Indicator Code': codes, 'Indicator Name': [names[code] for code in codes]}, dtype=object)
+    indicators = indicators.merge(indicator_meta, on='Indicator Code', how='left').reindex(columns=INDICATOR_COLUMNS)
+
+    country_meta = _read_metadata(
+        _glob(directory, 'Metadata_Country_API_*.csv'),
+        {'Country Code': 'Country Code', 'Region': 'Region', 'IncomeGroup': 'Income Group'},
+        'Country Code'
+    )
+    countries = pd.concat(countries, ignore_index=True).drop_duplicates(subset=['country_id']).astype({'country_id': 'int32'})
+    countries = countries.sort_values('country_id').merge(country_meta, on='Country Code', how='left')
+    return WorldBankTables(values, indicators, countries.reindex(columns=COUNTRY_COLUMNS).reset_index(drop=True))
+
+
+def write_worldbank_cache(tables, directory=BASE_DIR):
+    sources = _source_paths(directory)
+    return [_write_cache(getattr(tables, name), f'worldbank.{name}', sources) for name in TABLES]
+
+
+def _read_worldbank_cache(directory):
+    # None unless every table was cached from the current files
+    sources = _source_paths(directory)
+    frames = {name: _read_cache(f'worldbank.{name}', sources) for name in TABLES}
+    return WorldBankTables(**frames) if all(frame is not None for frame in frames.values()) else None
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_worldbank(directory, listing):
+    try:
+        tables = _read_worldbank_cache(directory)
+    except Exception:
+        tables = None
+    if tables is None:
+        tables = build_worldbank(directory, workers=1)
+        try:
+            write_worldbank_cache(tables, directory)
+        except Exception:
+            pass
+    dataset_registry().add('worldbank', tables.values)
+    return tables
+
+
+def load_worldbank(directory=BASE_DIR):
+    # Every API_* download of the directory, from the cache the CLI writes;
+    # reloaded when a file is added, removed or replaced. The tables are
+    # frozen and shared as they are.
+    listing = tuple((path, file_fingerprint(path)) for path in _source_paths(directory))
+    return _load_worldbank(directory, listing)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load every World Bank API_* CSV of a directory into the columnar cache.')
+    parser.add_argument('directory', nargs='?', default=BASE_DIR)
+    parser.add_argument('--workers', type=int, help='processes (default: one per core)')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    tables = build_worldbank(args.directory, args.workers)
+    print(f'{len(tables.indicators)} indicators, {len(tables.countries)} countries, {len(tables):,} values in {time.perf_counter() - started:.2f} s')
+    print(tables.indicators[['Indicator Code', 'Indicator Name']].to_string(index=False))
+    for cache_file in write_worldbank_cache(tables, args.directory):
+        print(cache_file)